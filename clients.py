@@ -0,0 +1,65 @@
+import atexit
+import asyncio
+import weakref
+from functools import lru_cache
+
+import httpx
+from openai import OpenAI, AsyncOpenAI
+
+# Large Whisper uploads and chat completions on long transcripts can take a while
+DEFAULT_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
+# httpx async connections belong to the event loop that opened them, so async
+# clients are kept per loop and forgotten when the loop goes away
+_async_clients = weakref.WeakKeyDictionary()
+
+
+@lru_cache(maxsize=1)
+def get_http_client():
+    """Shared pooled HTTP/2 client for downloads and the synchronous OpenAI client"""
+    client = httpx.Client(
+        http2=True,
+        follow_redirects=True,
+        timeout=DEFAULT_TIMEOUT,
+        limits=httpx.Limits(max_keepalive_connections=16)
+    )
+    atexit.register(client.close)
+    return client
+
+
+@lru_cache(maxsize=1)
+def get_openai():
+    """Process-wide synchronous OpenAI client
+
+    Raises if no API key is configured; the failure isn't cached, so a later
+    call can succeed once the key is set.
+    """
+    return OpenAI(http_client=get_http_client())
+
+
+def get_async_openai(max_connections=8):
+    """AsyncOpenAI client for the running event loop
+
+    Every coroutine on the same loop shares one HTTP/2 connection pool. The
+    pool size is fixed by whichever caller creates the client first.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = AsyncOpenAI(http_client=httpx.AsyncClient(
+            http2=True,
+            timeout=DEFAULT_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            )
+        ))
+        _async_clients[loop] = client
+    return client
+
+
+async def close_async_openai():
+    """Close the running loop's AsyncOpenAI client, e.g. before asyncio.run returns"""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
@@ -0,0 +1,34 @@
+from functools import wraps
+import threading
+import time
+
+
+def ttl_cache(ttl):
+    """
+    Cache the decorated function's result per positional arguments for `ttl` seconds.
+
+    Meant for cheap-to-store but expensive-to-compute facts about the
+    environment that rarely change, such as whether a binary is installed.
+    Once an entry expires the next call recomputes it.
+    """
+    def decorator(func):
+        cache = {}
+        lock = threading.Lock()
+
+        @wraps(func)
+        def wrapper(*args):
+            now = time.monotonic()
+            with lock:
+                entry = cache.get(args)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+            value = func(*args)
+            with lock:
+                cache[args] = (now + ttl, value)
+            return value
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
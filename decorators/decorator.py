@@ -1,36 +1,27 @@
-from functools import wraps
-import time
+# Run from the repository root with: python -m decorators.decorator
+import itertools
 
+from decorators.retry import retry
 
-def retry_on_exception(max_attempts=3, wait_time=2):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            attempts = 0
-            while attempts < max_attempts:
-                try:
-                    return func(*args, **kwargs)
-                except Exception as error:
-                    attempts += 1
-                    print(f"Attempt {attempts} failed: {error}. Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-            return None
-        return wrapper
-    return decorator
 
+def make_fetch_data():
+    """Build a fetch_data demo that fails twice before succeeding"""
+    # Counter to track number of function calls, private to this demo instance
+    attempt_counter = itertools.count(1)
 
-# Counter to track number of function calls
-attempt_counter = 0
+    # Example function using the decorator for retry logic
+    @retry(max_attempts=3, base_delay=2)
+    def fetch_data():
+        attempt = next(attempt_counter)
+        if attempt < 3:
+            raise ValueError(f"Request failed on attempt {attempt}!")
+        return "Data fetched successfully"
 
-# Example function using the decorator for retry logic
-@retry_on_exception(max_attempts=3, wait_time=2)
-def fetch_data():
-    global attempt_counter
-    attempt_counter += 1
-    if attempt_counter < 3:
-        raise ValueError(f"Request failed on attempt {attempt_counter}!")
-    return "Data fetched successfully"
+    return fetch_data
 
-# Execute the function once, it will retry automatically
-response = fetch_data()
-print(response)
\ No newline at end of file
+
+if __name__ == "__main__":
+    # Execute the function once, it will retry automatically
+    fetch_data = make_fetch_data()
+    response = fetch_data()
+    print(response)
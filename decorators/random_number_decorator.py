@@ -5,19 +5,23 @@ import random
 # TODO: enhance a Python function that checks whether a random number is greater than 8 
 # with retries and failure handling using Python decorators. 
 # Task is to complete the decorator and see how the function retries up to ten times before succeeding or stopping!
-def retry_on_exception(max_attempts, wait_time):
+def retry_on_exception(max_attempts, wait_time, cap=30):
+    # Backoff doubles from wait_time up to cap; the schedule is fixed once decorated
+    backoff = tuple(min(wait_time * 2 ** attempt, cap) for attempt in range(max_attempts - 1))
+
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-             # TODO: implement the retry logic
-            attempts = 0
-            while attempts < max_attempts:
+            for attempt, base in enumerate(backoff, start=1):
                 try:
                     return func(*args, **kwargs)
                 except Exception as error:
-                    attempts += 1
-                    print(f"Attempt {attempts} failed: {error}. Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
+                    # Jitter keeps parallel callers from retrying in lockstep
+                    delay = base + random.uniform(0, wait_time)
+                    print(f"Attempt {attempt} failed: {error}. Retrying in {delay:.1f} seconds...")
+                    time.sleep(delay)
+            # Last attempt: let the exception reach the caller instead of returning None
+            return func(*args, **kwargs)
         return wrapper
     return decorator
 
@@ -31,6 +35,7 @@ def check_random_number():
     return f"Number {num} is greater than 8."
 
 
-# Execute the function once, it will retry automatically
-response = check_random_number()
-print(response)
\ No newline at end of file
+if __name__ == "__main__":
+    # Execute the function once, it will retry automatically
+    response = check_random_number()
+    print(response)
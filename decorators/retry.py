@@ -0,0 +1,85 @@
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from functools import wraps
+import random
+import time
+
+# Client errors that can succeed on a later attempt: timeout, conflict, rate limit
+RETRYABLE_CLIENT_STATUSES = frozenset({408, 409, 429})
+
+
+def root_cause(error):
+    """Follow `raise ... from e` chains back to the original exception"""
+    while error.__cause__ is not None:
+        error = error.__cause__
+    return error
+
+
+def _response(error):
+    """The HTTP response attached to an OpenAI, httpx or requests error, if any"""
+    return getattr(error, 'response', None)
+
+
+def is_retryable(error):
+    """False for client errors (4xx) that would fail again with the same request"""
+    status = getattr(_response(error), 'status_code', None)
+    if status is None or not 400 <= status < 500:
+        return True
+    return status in RETRYABLE_CLIENT_STATUSES
+
+
+def retry_after(error):
+    """Return the server's Retry-After hint in seconds, or None if there isn't one"""
+    headers = getattr(_response(error), 'headers', None)
+    value = headers.get('retry-after') if headers is not None else None
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    # The header may also be an HTTP-date
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def retry(max_attempts=3, base_delay=1.0, cap=30.0, max_elapsed=300.0, exceptions=(Exception,)):
+    """Retry the decorated function with exponential backoff, jitter and a total time budget
+
+    A server's Retry-After wait is used when given, and 4xx errors other than 408/409/429 are not retried.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            delay = base_delay
+            deadline = time.monotonic() + max_elapsed
+
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    return func(*args, **kwargs)
+
+                except exceptions as e:
+                    cause = root_cause(e)
+                    if not is_retryable(cause) or attempt == max_attempts:
+                        raise
+
+                    delay = min(cap, random.uniform(base_delay, delay * 3))
+                    wait = retry_after(cause)
+                    if wait is None:
+                        wait = delay
+                    if time.monotonic() + wait > deadline:
+                        print(f"Attempt {attempt} failed: {e}. Not retrying, {max_elapsed:.0f}s retry budget exhausted")
+                        raise
+
+                    print(f"Attempt {attempt} failed: {e}. Retrying in {wait:.1f} seconds...")
+                    time.sleep(wait)
+        return wrapper
+
+    return decorator
@@ -1,8 +1,164 @@
 import os
+import re
+import json
+import asyncio
 import tempfile
+import threading
 import subprocess
+from functools import lru_cache
 from urllib.parse import urlparse, parse_qs
-from openai import OpenAI
+import httpx
+from clients import get_openai, get_async_openai, close_async_openai
+
+# Optional downloaders, imported once at startup rather than on every download
+try:
+    import gdown as _gdown
+except ImportError:
+    _gdown = None
+
+try:
+    import yt_dlp as _yt_dlp
+except ImportError:
+    _yt_dlp = None
+
+
+@lru_cache(maxsize=4096)
+def _cached_urlparse(url):
+    """urlparse with memoization; a single download classifies the same URL several times"""
+    return urlparse(url)
+
+
+# How often to look for newly finished segments while ffmpeg is running
+SEGMENT_POLL_INTERVAL = 0.2
+# Audio bitrate assumed for videos that don't report one; high enough that
+# segments stay under the upload limit for any common audio track
+ASSUMED_AUDIO_BIT_RATE = 320_000
+
+# Direct media downloads are streamed in 1MB reads, at most 16 at a time
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+MAX_CONCURRENT_DOWNLOADS = 16
+# Number of downloaded chunks gathered into a single write syscall
+WRITE_BATCH_SIZE = 8
+
+# Background event loop shared by every synchronous download caller, with its
+# HTTP client and concurrency limit. The client and semaphore are only touched
+# from the loop's own thread.
+_download_loop = None
+_download_loop_lock = threading.Lock()
+_download_client = None
+_download_slots = None
+
+
+def _get_download_loop():
+    """Start the background download loop on first use and return it"""
+    global _download_loop
+    with _download_loop_lock:
+        if _download_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='downloads', daemon=True).start()
+            _download_loop = loop
+    return _download_loop
+
+
+async def _download_on_loop(url):
+    """Download a direct media URL over the loop's shared connection pool"""
+    global _download_client, _download_slots
+    if _download_client is None:
+        _download_client = httpx.AsyncClient(timeout=60, http2=True, follow_redirects=True)
+        _download_slots = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+    async with _download_slots:
+        return await URLService.download_direct_media_async(url, _download_client)
+
+
+def _segment_command(path, seconds, output_dir, reencode=False):
+    """Build the ffmpeg segment-muxer command that splits `path` into `seconds`-long chunks
+    
+    Only the audio is kept, and by default it is copied so nothing is
+    re-encoded. With `reencode=True` the audio track is re-encoded as MP3, for
+    codecs that can't be stream-copied into segments.
+    """
+    cmd = [
+        'ffmpeg', '-y',
+        '-i', path,
+        '-f', 'segment',
+        '-segment_time', str(seconds),
+        '-reset_timestamps', '1',
+    ]
+    if reencode:
+        return cmd + ['-vn', '-c:a', 'libmp3lame', os.path.join(output_dir, 'chunk_%05d.mp3')]
+    
+    ext = os.path.splitext(path)[1] or '.mp3'
+    return cmd + ['-vn', '-c:a', 'copy', os.path.join(output_dir, f'chunk_%05d{ext}')]
+
+
+def _list_segments(output_dir):
+    """Return segment paths in output_dir in segment order"""
+    with os.scandir(output_dir) as entries:
+        # Zero-padded names sort in segment order
+        return sorted(e.path for e in entries if e.name.startswith('chunk_'))
+
+
+def _preallocate(fileobj, size):
+    """Reserve `size` bytes on disk for fileobj where the platform supports it"""
+    if not size or not hasattr(os, 'posix_fallocate'):
+        return False
+    try:
+        os.posix_fallocate(fileobj.fileno(), 0, size)
+        return True
+    except OSError:
+        # Some filesystems (e.g. tmpfs on older kernels) don't support it
+        return False
+
+
+def _downloaded_file(temp_dir):
+    """Return the file a downloader left in temp_dir, checking that it isn't empty"""
+    with os.scandir(temp_dir) as entries:
+        files = [entry for entry in entries if entry.is_file()]
+    if not files:
+        raise Exception("No file downloaded")
+    
+    downloaded = files[0]
+    if downloaded.stat().st_size == 0:
+        raise Exception("Downloaded file is empty")
+    return downloaded.path
+
+
+class BatchedWriter:
+    """Collects chunks and writes each batch to a file with a single writev syscall
+    
+    Falls back to one write per chunk on platforms without os.writev.
+    """
+    
+    def __init__(self, fileobj, batch_size=WRITE_BATCH_SIZE):
+        self.fileobj = fileobj
+        self.batch_size = batch_size
+        self.pending = []
+    
+    def add(self, chunk):
+        """Queue a chunk, returning True once a full batch is ready to flush"""
+        self.pending.append(chunk)
+        return len(self.pending) >= self.batch_size
+    
+    def flush(self):
+        """Write every queued chunk to the file"""
+        buffers, self.pending = self.pending, []
+        if not hasattr(os, 'writev'):
+            for chunk in buffers:
+                self.fileobj.write(chunk)
+            return
+        
+        # Write straight to the descriptor, after anything Python has buffered
+        self.fileobj.flush()
+        fd = self.fileobj.fileno()
+        while buffers:
+            written = os.writev(fd, buffers)
+            # writev may stop short; drop what was written and retry the rest
+            while buffers and written >= len(buffers[0]):
+                written -= len(buffers[0])
+                buffers.pop(0)
+            if buffers and written:
+                buffers[0] = buffers[0][written:]
+
 
 class GoogleDriveService:
     """Service for handling Google Drive video downloads"""
@@ -10,7 +166,7 @@ class GoogleDriveService:
     @staticmethod
     def is_google_drive_url(url):
         """Check if URL is a Google Drive URL"""
-        parsed = urlparse(url)
+        parsed = _cached_urlparse(url)
         return 'drive.google.com' in parsed.netloc
     
     @staticmethod
@@ -19,7 +175,7 @@ class GoogleDriveService:
         if '/file/d/' in url:
             return url.split('/file/d/')[1].split('/')[0]
         elif 'id=' in url:
-            parsed = urlparse(url)
+            parsed = _cached_urlparse(url)
             query_params = parse_qs(parsed.query)
             return query_params.get('id', [None])[0]
         return None
@@ -27,9 +183,7 @@ class GoogleDriveService:
     @staticmethod
     def download_file(url):
         """Download file from Google Drive using gdown"""
-        try:
-            import gdown
-        except ImportError:
+        if _gdown is None:
             raise ImportError("gdown is required for Google Drive downloads. Install with: pip install gdown")
         
         file_id = GoogleDriveService.get_file_id(url)
@@ -44,19 +198,22 @@ class GoogleDriveService:
         # Download using gdown
         download_url = f"https://drive.google.com/uc?id={file_id}"
         try:
-            gdown.download(download_url, output, quiet=False)
+            _gdown.download(download_url, output, quiet=False)
         except Exception as e:
             # Try alternative download method
             try:
-                gdown.download(download_url, output, quiet=False, fuzzy=True)
+                _gdown.download(download_url, output, quiet=False, fuzzy=True)
             except Exception as e2:
                 raise ValueError(f"Failed to download from Google Drive: {str(e2)}")
         
-        # Verify file was downloaded
-        if not os.path.exists(output) or os.path.getsize(output) == 0:
-            if os.path.exists(output):
-                os.remove(output)
-            raise ValueError("Downloaded file is empty or failed to download")
+        # Verify file was downloaded, with a single stat call
+        try:
+            size = os.stat(output).st_size
+        except FileNotFoundError:
+            raise ValueError("Download failed: no output file")
+        if size == 0:
+            os.remove(output)
+            raise ValueError("Downloaded file is empty")
         
         return output
 
@@ -67,7 +224,7 @@ class LinkedInService:
     @staticmethod
     def is_linkedin_url(url):
         """Check if URL is a LinkedIn URL"""
-        parsed = urlparse(url)
+        parsed = _cached_urlparse(url)
         valid_paths = [
             '/feed/update/urn:li:activity:',  # Existing format
             '/posts/'  # New format to support
@@ -77,9 +234,7 @@ class LinkedInService:
     @staticmethod
     def download_video(url):
         """Download video from LinkedIn using yt-dlp"""
-        try:
-            import yt_dlp
-        except ImportError:
+        if _yt_dlp is None:
             raise ImportError("yt-dlp is required for LinkedIn downloads. Install with: pip install yt-dlp")
         
         print("Downloading LinkedIn video...")
@@ -98,21 +253,11 @@ class LinkedInService:
                 'progress_hooks': [lambda d: print(f"Status: {d['status']}")],
             }
             
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            with _yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 ydl.download([url])
             
             # Find downloaded file
-            files = os.listdir(temp_dir)
-            if not files:
-                raise Exception("No file downloaded")
-            
-            downloaded_file = os.path.join(temp_dir, files[0])
-            
-            # Verify file exists and is not empty
-            if not os.path.exists(downloaded_file) or os.path.getsize(downloaded_file) == 0:
-                raise Exception("Downloaded file is empty")
-            
-            return downloaded_file
+            return _downloaded_file(temp_dir)
             
         except Exception as e:
             # Clean up temp directory on error
@@ -127,21 +272,21 @@ class LinkedInService:
 class MediaProcessorService:
     """Service for processing and summarizing media transcriptions"""
     
-    def __init__(self):
-        try:
-            self.client = OpenAI()
-        except Exception as e:
-            print(f"Warning: OpenAI client initialization failed: {e}")
-            self.client = None
+    def __init__(self, max_concurrency=8, chunk_mb=20):
+        self.client = get_openai()
+        # Upper bound on in-flight Whisper requests to stay under OpenAI rate limits
+        self.max_concurrency = max_concurrency
+        # Target chunk size, with headroom under Whisper's 25MB limit for VBR audio
+        self.chunk_mb = chunk_mb
     
-    def transcribe_small_media(self, file_path):
+    async def transcribe_small_media(self, file_path):
         """Transcribe small media files using OpenAI Whisper"""
-        if not self.client:
-            raise Exception("OpenAI client not available")
+        # All uploads on this event loop share one HTTP/2 connection pool
+        async_client = get_async_openai(self.max_concurrency)
         
         try:
             with open(file_path, 'rb') as audio_file:
-                transcript = self.client.audio.transcriptions.create(
+                transcript = await async_client.audio.transcriptions.create(
                     model="whisper-1",
                     file=audio_file,
                     response_format="text"
@@ -151,37 +296,122 @@ class MediaProcessorService:
             print(f"Error transcribing {file_path}: {e}")
             return None
     
-    def transcribe(self, file_path):
-        """Transcribe a large media file by splitting it into chunks"""
-        from media_utils import split_media, cleanup_temp_files
+    async def _produce_segments(self, file_path, chunk_seconds, segment_dir, queue):
+        """Run ffmpeg and enqueue (index, path) for each segment as soon as it is complete
         
-        chunks = []
+        The segment muxer closes a segment when it opens the next one, so while
+        ffmpeg runs every file except the newest is safe to upload.
+        """
+        produced = 0
+        for reencode in (False, True):
+            proc = subprocess.Popen(
+                _segment_command(file_path, chunk_seconds, segment_dir, reencode),
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            try:
+                while True:
+                    finished = proc.poll() is not None
+                    if finished and proc.returncode != 0:
+                        break
+                    
+                    segments = _list_segments(segment_dir)
+                    ready = segments if finished else segments[:-1]
+                    for path in ready[produced:]:
+                        await queue.put((produced, path))
+                        produced += 1
+                    
+                    if finished:
+                        return
+                    await asyncio.sleep(SEGMENT_POLL_INTERVAL)
+            finally:
+                if proc.poll() is None:
+                    proc.kill()
+                    proc.wait()
+            
+            # Only restart from scratch if nothing has been handed to the consumers yet
+            if produced or reencode:
+                raise subprocess.CalledProcessError(proc.returncode, proc.args)
+            print("Stream copy segmenting failed, re-encoding audio instead...")
+            for leftover in _list_segments(segment_dir):
+                os.unlink(leftover)
+    
+    async def transcribe_async(self, file_path):
+        """Transcribe a large media file by splitting it into chunks, uploading
+        each chunk as soon as ffmpeg has written it"""
+        from media_utils import get_media_info, cleanup_temp_files
+        
+        segment_dir = tempfile.mkdtemp()
         try:
-            # Split media into 1MB chunks for testing (you can adjust this)
-            chunks = split_media(file_path, 1)
-            transcriptions = []
+            info = get_media_info(file_path)
+            if not info or not info['duration']:
+                raise Exception("Could not determine audio duration")
+            
+            # Segments carry only the audio, so size them from its bitrate
+            if info['audio_bit_rate']:
+                bit_rate = info['audio_bit_rate']
+            elif not info['has_video']:
+                bit_rate = info['bit_rate'] or info['size'] * 8 / info['duration']
+            else:
+                bit_rate = ASSUMED_AUDIO_BIT_RATE
+            chunk_seconds = self.chunk_mb * 1024 * 1024 * 8 / bit_rate
             
-            for chunk in chunks:
-                # Transcribe each chunk
-                text = self.transcribe_small_media(chunk)
-                if text:
-                    transcriptions.append(text)
+            queue = asyncio.Queue()
+            results = {}
             
-            return ' '.join(transcriptions)
+            async def produce():
+                try:
+                    await self._produce_segments(file_path, chunk_seconds, segment_dir, queue)
+                finally:
+                    # One sentinel per consumer so they all exit once the queue drains
+                    for _ in range(self.max_concurrency):
+                        await queue.put(None)
+            
+            async def consume():
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        return
+                    index, chunk = item
+                    transcript = await self.transcribe_small_media(chunk)
+                    if transcript is None:
+                        # A missing chunk would leave a silent gap in the transcript
+                        raise Exception(f"Chunk {index + 1} could not be transcribed")
+                    results[index] = transcript
+            
+            # The number of consumers bounds the in-flight Whisper requests
+            tasks = [asyncio.ensure_future(produce())]
+            tasks += [asyncio.ensure_future(consume()) for _ in range(self.max_concurrency)]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                # On the first failure stop the rest instead of uploading chunks for nothing
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+            
+            # Segment indices restore the original order
+            return ' '.join(results[i] for i in sorted(results) if results[i])
             
         except Exception as e:
             print(f"Error processing large file: {e}")
             return None
         finally:
             # Clean up all chunks in the finally block
-            if chunks:
-                cleanup_temp_files(chunks)
+            cleanup_temp_files(segment_dir)
+    
+    def transcribe(self, file_path):
+        """Synchronous entrypoint for transcribe_async"""
+        async def run():
+            try:
+                return await self.transcribe_async(file_path)
+            finally:
+                # The loop asyncio.run created dies with this call, so release its client
+                await close_async_openai()
+        
+        return asyncio.run(run())
     
     def summarize_transcription(self, text):
         """Generate a structured summary of transcription using OpenAI GPT-4"""
-        if not self.client:
-            raise Exception("OpenAI client not available")
-        
         try:
             response = self.client.chat.completions.create(
                 model="gpt-4o-mini",  # Using gpt-4o-mini for cost efficiency
@@ -221,9 +451,6 @@ class MediaProcessorService:
     
     def extract_key_topics(self, text):
         """Extract key topics and themes from transcription"""
-        if not self.client:
-            raise Exception("OpenAI client not available")
-        
         try:
             response = self.client.chat.completions.create(
                 model="gpt-4o-mini",
@@ -252,6 +479,71 @@ class MediaProcessorService:
             print(f"Error extracting topics: {e}")
             return None
 
+    def analyze_transcription(self, text):
+        """Generate the summary and key topics of a transcription in a single request
+        
+        Returns a dict with 'summary' and 'key_topics' keys, or None on failure.
+        Prefer this over calling summarize_transcription and extract_key_topics
+        back to back: it halves the round-trips and sends the transcription once.
+        """
+        try:
+            response = self.client.chat.completions.create(
+                model="gpt-4o-mini",
+                response_format={"type": "json_object"},
+                messages=[
+                    {
+                        "role": "system",
+                        "content": (
+                            "You are an expert content analyst and summarizer. "
+                            "Analyze the provided transcription and respond with a JSON object "
+                            "containing exactly two string fields:\n\n"
+                            "\"summary\": a structured summary that preserves critical details, "
+                            "the original tone and intent, formatted as:\n"
+                            "1. A one-sentence overview\n"
+                            "2. 2-3 key takeaways\n"
+                            "3. Important details or quotes (if any)\n\n"
+                            "\"key_topics\": a bulleted list with categories covering the main "
+                            "topics discussed, key themes and concepts, and important keywords "
+                            "and phrases."
+                        )
+                    },
+                    {
+                        "role": "user",
+                        "content": f"Summarize and extract key topics from this transcription:\n\n{text}"
+                    }
+                ],
+                max_tokens=1500,
+                temperature=0.3
+            )
+            result = json.loads(response.choices[0].message.content)
+            return {
+                'summary': result.get('summary'),
+                'key_topics': result.get('key_topics')
+            }
+        except Exception as e:
+            print(f"Error analyzing transcription: {e}")
+            return None
+
+
+# One pass classification for URLService.identify_url_type. Branches are tried
+# in order, so priority matches the old if/elif chain, and each named group is
+# the type string returned for it.
+_URL_TYPE_RE = re.compile(
+    r'(?:[a-z][a-z0-9+.-]*:)?//[^/?#]*(?P<google_drive>drive\.google\.com)'
+    r'|(?:[a-z][a-z0-9+.-]*:)?//[^/?#]*linkedin\.com[^/?#]*'
+    r'[^?#]*?(?P<linkedin>/feed/update/urn:li:activity:|/posts/)'
+    r'|.*?(?P<youtube>youtube\.com|youtu\.be)'
+    r'|.*?(?P<direct_media>\.(?:mp3|mp4|wav|m4a|flac))',
+    re.IGNORECASE | re.DOTALL
+)
+
+
+@lru_cache(maxsize=4096)
+def _identify_url_type(url):
+    """Memoized backend for URLService.identify_url_type"""
+    match = _URL_TYPE_RE.match(url)
+    return match.lastgroup if match else "unknown"
+
 
 class URLService:
     """Service for handling various URL types and downloads"""
@@ -259,16 +551,7 @@ class URLService:
     @staticmethod
     def identify_url_type(url):
         """Identify the type of URL"""
-        if GoogleDriveService.is_google_drive_url(url):
-            return "google_drive"
-        elif LinkedInService.is_linkedin_url(url):
-            return "linkedin"
-        elif any(domain in url.lower() for domain in ['youtube.com', 'youtu.be']):
-            return "youtube"
-        elif any(ext in url.lower() for ext in ['.mp3', '.mp4', '.wav', '.m4a', '.flac']):
-            return "direct_media"
-        else:
-            return "unknown"
+        return _identify_url_type(url)
     
     @staticmethod
     def download_from_url(url):
@@ -289,9 +572,7 @@ class URLService:
     @staticmethod
     def download_youtube_video(url):
         """Download video from YouTube using yt-dlp"""
-        try:
-            import yt_dlp
-        except ImportError:
+        if _yt_dlp is None:
             raise ImportError("yt-dlp is required for YouTube downloads. Install with: pip install yt-dlp")
         
         temp_dir = tempfile.mkdtemp()
@@ -305,31 +586,72 @@ class URLService:
                 'no_warnings': True,
             }
             
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            with _yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 ydl.download([url])
             
-            files = os.listdir(temp_dir)
-            if not files:
-                raise Exception("No file downloaded")
-            
-            return os.path.join(temp_dir, files[0])
+            return _downloaded_file(temp_dir)
             
         except Exception as e:
             import shutil
             shutil.rmtree(temp_dir, ignore_errors=True)
             raise ValueError(f"Failed to download YouTube video: {str(e)}")
     
+    @staticmethod
+    def submit_download(url):
+        """Start downloading a direct media URL on the background loop
+        
+        Returns a concurrent.futures.Future for the downloaded file's path.
+        Downloads from every thread share one event loop and connection pool,
+        so waiting on many of them doesn't need a busy thread each.
+        """
+        return asyncio.run_coroutine_threadsafe(_download_on_loop(url), _get_download_loop())
+    
     @staticmethod
     def download_direct_media(url):
         """Download media file directly from URL"""
-        import requests
+        return URLService.submit_download(url).result()
+    
+    @staticmethod
+    def download_many(urls):
+        """Download several direct media URLs concurrently, returning paths in input order"""
+        futures = [URLService.submit_download(url) for url in urls]
+        return [future.result() for future in futures]
+    
+    @staticmethod
+    async def download_direct_media_async(url, client=None):
+        """Download media file directly from URL without blocking the event loop
         
+        Pass a shared httpx.AsyncClient to reuse its connection pool across
+        downloads; otherwise a client is created for this download only.
+        """
         try:
-            response = requests.get(url, stream=True, timeout=60)
+            if client is not None:
+                return await URLService._fetch_direct_media(client, url)
+            async with httpx.AsyncClient(timeout=60, http2=True, follow_redirects=True) as client:
+                return await URLService._fetch_direct_media(client, url)
+        except Exception as e:
+            raise ValueError(f"Failed to download media from URL: {str(e)}") from e
+    
+    @staticmethod
+    async def download_many_async(urls, max_concurrency=MAX_CONCURRENT_DOWNLOADS):
+        """Download several direct media URLs concurrently over one connection pool"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async with httpx.AsyncClient(timeout=60, http2=True, follow_redirects=True) as client:
+            async def download(url):
+                async with semaphore:
+                    return await URLService.download_direct_media_async(url, client)
+            
+            return await asyncio.gather(*(download(url) for url in urls))
+    
+    @staticmethod
+    async def _fetch_direct_media(client, url):
+        """Stream a URL into a temporary file and return its path"""
+        async with client.stream('GET', url) as response:
             response.raise_for_status()
             
             # Get file extension from URL or Content-Type
-            parsed_url = urlparse(url)
+            parsed_url = _cached_urlparse(url)
             filename = os.path.basename(parsed_url.path)
             if not filename or '.' not in filename:
                 content_type = response.headers.get('content-type', '')
@@ -342,33 +664,49 @@ class URLService:
             
             # Save to temporary file
             temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(filename)[1])
+            writer = BatchedWriter(temp_file)
+            loop = asyncio.get_running_loop()
             
-            for chunk in response.iter_content(chunk_size=8192):
-                temp_file.write(chunk)
+            try:
+                # Reserve the whole file up front so large downloads aren't fragmented.
+                # Content-Length only matches the bytes written when the body isn't
+                # compressed in transit.
+                size = int(response.headers.get('content-length') or 0)
+                encoding = response.headers.get('content-encoding', 'identity')
+                preallocated = encoding == 'identity' and _preallocate(temp_file, size)
+                
+                # Disk writes go to the default executor so other downloads keep flowing
+                received = 0
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    received += len(chunk)
+                    if writer.add(chunk):
+                        await loop.run_in_executor(None, writer.flush)
+                await loop.run_in_executor(None, writer.flush)
+                
+                if preallocated and received != size:
+                    os.ftruncate(temp_file.fileno(), received)
+            except Exception:
+                temp_file.close()
+                os.unlink(temp_file.name)
+                raise
             
             temp_file.close()
             return temp_file.name
-            
-        except Exception as e:
-            raise ValueError(f"Failed to download media from URL: {str(e)}")
 
 
 # Helper function to check if required packages are available
+@lru_cache(maxsize=1)
 def check_dependencies():
     """Check if required packages are installed"""
     missing_packages = []
     
-    try:
-        import gdown
-    except ImportError:
+    if _gdown is None:
         missing_packages.append("gdown")
     
-    try:
-        import yt_dlp
-    except ImportError:
+    if _yt_dlp is None:
         missing_packages.append("yt-dlp")
     
-    return missing_packages
+    return tuple(missing_packages)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,20 @@
+"""Gunicorn settings for serving the transcriber in production
+
+Run with: gunicorn -c gunicorn_conf.py transcriber_app:app
+"""
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:3000')
+
+# Sessions, jobs and the worker pools live in the app process, so there must be
+# exactly one worker process; concurrency comes from its threads instead. With
+# threads, a long upload holds only its own thread while status polls and
+# downloads keep being served.
+workers = 1
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '32'))
+
+# Large uploads on slow links can take minutes to arrive
+timeout = 600
+graceful_timeout = 60
+keepalive = 30
@@ -1,34 +1,35 @@
-from openai import OpenAI
-import requests
-import io 
-import time
-from functools import wraps
-import random
-
-client = OpenAI()
-
-# adding a decorator to handle retry on error: 
-def retry_on_error(max_retries=3, delay=5):
-
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            retries = 0
-
-            while retries < max_retries:
-                try:
-                    return func(*args, **kwargs)
-
-                except Exception as e:
-                    retries += 1
-                    if retries == max_retries:
-                        raise
-                    print(f"Error: {e}. Retrying in {delay} seconds...")
-                    time.sleep(delay)
-            return None
-        return wrapper
-    
-    return decorator
+import os
+import tempfile
+from clients import get_http_client, get_openai
+from decorators.retry import retry
+
+# Downloads and the OpenAI SDK share one pooled HTTP/2 client, so repeated
+# calls reuse open TCP/TLS connections instead of handshaking every time
+_HTTP = get_http_client()
+
+client = get_openai()
+
+# Keep downloads up to 32MB in memory, anything larger rolls over to disk
+SPOOL_MAX_SIZE = 32 << 20
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+def download_to_spool(url):
+    """
+    Stream a remote file into a SpooledTemporaryFile so the whole body is never
+    held in memory twice. The returned file is rewound and ready to upload.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    try:
+        with _HTTP.stream('GET', url) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                spool.write(chunk)
+    except BaseException:
+        # Don't leave a rolled-over temp file behind for every failed attempt
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
 
 def basic_example():
     try:
@@ -56,6 +57,18 @@ def basic_chat():
     except Exception as e:
         print(f"API Request Failed: {e}")
 
+def _transcribe(file_like, name='audio.mp3'):
+    """
+    Send a binary file-like object to OpenAI's Whisper API and return the text.
+    The plain text response format skips building and parsing a JSON payload.
+    """
+    return client.audio.transcriptions.create(
+        model="whisper-1",
+        file=(name, file_like),
+        response_format="text",
+        timeout=60
+    )
+
 def transcribe_audio(file_path):
     
     """
@@ -63,47 +76,25 @@ def transcribe_audio(file_path):
     """
     try:
         with open(file_path, 'rb') as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                timeout=60
-            )
-
-            return transcript.text
+            return _transcribe(audio_file, name=os.path.basename(file_path))
 
     except Exception as e:
-        raise Exception(f"Transcription failed: {str(e)}")
+        raise Exception(f"Transcription failed: {str(e)}") from e
     
 # Adding a retry decorator to the transcribe_remote function
-@retry_on_error(max_retries=3, delay=5)
+@retry(max_attempts=3, base_delay=5)
 def transcribe_remote(url):
     """
     Transcribe a remote video file from a URL using OpenAI's Whisper API.
     """
-
-    # Simulating a random error for testing purposes... 
-    if random.randint(1, 2) == 1:
-        raise ValueError("Simulated error for testing retry logic.")
     try:
-        # TODO: Download the content using the `requests` library
-        response = requests.get(url, stream = True)
+        # TODO: Download the content using the shared HTTP client
         # TODO: Send the content to OpenAI API
-        
-        # # mp4 downloaded from URL: not necessary as whisper takes in stream of data, which avoids processing bytes in memory by storing it in a file
-        # if response.status_code == 200:
-        #     with open(filename, 'wb') as f:
-        #         for chunk in response.iter_content(chunk_size=8192):
-        #             f.write(chunk)
-            
-        transcript = client.audio.transcriptions.create(
-            model="whisper-1",
-            file=('video.mp4', response.content),
-            timeout=60
-        )
-        return transcript.text
+        with download_to_spool(url) as video_file:
+            return _transcribe(video_file, name='video.mp4')
             
     except Exception as e:
-        return f"Error: {str(e)}"
+        raise Exception(f"Remote transcription failed: {str(e)}") from e
     
 
 # TODO: Implement error handling and retrying decorator
@@ -112,21 +103,14 @@ def transcribe_remote(url):
 # to retry up to 3 times, with a delay of 1 second between retries
     # DONE
 
-@retry_on_error(max_retries=3, delay=5)
+@retry(max_attempts=3, base_delay=5)
 def transcribe_audio_from_url(url):
 
-    response = requests.get(url, stream = True)
     # TODO: Open the audio file in binary mode
     # passing file-like object to OpenAI API
-    audio_byte = io.BytesIO(response.content)
-    audio_byte.name = 'audio.mp3'  # Set a name for the BytesIO object to mimic a file
-
-    # TODO: Create a transcription request with a timeout and specific model
-    transcript = client.audio.transcriptions.create(
-            model = "whisper-1",
-            file  = audio_byte
-        )
-    return transcript.text
+    with download_to_spool(url) as audio_file:
+        # TODO: Create a transcription request with a timeout and specific model
+        return _transcribe(audio_file)
     # TODO: Print the transcribed text
 
 if __name__ == "__main__":
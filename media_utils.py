@@ -1,40 +1,222 @@
 import subprocess
 import os
+import sys
 import json
 import math
+import re
+import selectors
+import shutil
+import sqlite3
 import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache, partial
 from typing import Optional, Dict, Any, List
 
+from decorators.cache import ttl_cache
+
+# PyAV wraps libavformat in-process, which avoids starting an ffprobe per file
+try:
+    import av as _av
+except ImportError:
+    _av = None
+
+_VALID_EXTENSIONS = ('.mp3', '.mp4', '.wav', '.flac', '.avi', '.mov', '.m4a', '.aac', '.ogg', '.wma', '.wmv', '.flv', '.webm', '.mkv')
+_VALID_EXT_SET = frozenset(_VALID_EXTENSIONS)
+
+# How long an FFmpeg availability check is trusted, so installing it mid-run is noticed
+FFMPEG_CHECK_TTL = 300
+
+# Fixed parts of the ffprobe commands; only the file path is added per call
+_FFPROBE_VERSION_CMD = ('ffprobe', '-version')
+_DURATION_PROBE_CMD = (
+    'ffprobe',
+    '-v', 'quiet',
+    '-show_entries', 'format=duration',
+    '-of', 'default=noprint_wrappers=1:nokey=1'
+)
+_INFO_PROBE_CMD = (
+    'ffprobe',
+    '-v', 'quiet',
+    '-print_format', 'json',
+    # Ask only for the fields get_media_info reads instead of the full format/stream dump
+    '-show_entries',
+    'format=duration,size,format_name,bit_rate:stream=codec_type,codec_name,sample_rate,channels,bit_rate'
+)
+
+# orjson parses ffprobe output several times faster; its errors subclass
+# json.JSONDecodeError, so error handling is the same either way
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# ffprobe results are kept on disk so unchanged files are never probed twice.
+# The file name is versioned; bump it when get_media_info gains or changes fields
+FFPROBE_CACHE_PATH = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+    'transcriber', 'ffprobe-v2.db'
+)
+FFPROBE_CACHE_TTL = 14 * 24 * 3600  # Two weeks
+# Long-running servers probe many short-lived files, so stale rows are purged as they go
+FFPROBE_CACHE_PURGE_EVERY = 256  # inserts
+
+_ffprobe_cache = None
+_ffprobe_cache_lock = threading.Lock()
+_ffprobe_cache_inserts = 0
+
+def _probe_cache_key(file_path: str, stat_result: Optional[os.stat_result] = None) -> tuple:
+    """Identify a file's current contents by path, size and modification time"""
+    st = stat_result if stat_result is not None else os.stat(file_path)
+    return (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+
+def _open_ffprobe_cache():
+    """Open the ffprobe cache database once, or return None if it can't be used"""
+    global _ffprobe_cache
+    if _ffprobe_cache is None:
+        try:
+            os.makedirs(os.path.dirname(FFPROBE_CACHE_PATH), exist_ok=True)
+            conn = sqlite3.connect(FFPROBE_CACHE_PATH, check_same_thread=False)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS probes '
+                '(path TEXT, size INTEGER, mtime_ns INTEGER, info TEXT, created REAL, '
+                'PRIMARY KEY (path, size, mtime_ns))'
+            )
+            _purge_ffprobe_cache(conn)
+            _ffprobe_cache = conn
+        except (sqlite3.Error, OSError) as e:
+            print(f"Warning: ffprobe cache disabled: {e}")
+            _ffprobe_cache = False
+    return _ffprobe_cache or None
+
+def _purge_ffprobe_cache(conn) -> None:
+    """Delete expired rows and rows for files that no longer exist"""
+    conn.execute('DELETE FROM probes WHERE created < ?', (time.time() - FFPROBE_CACHE_TTL,))
+    paths = [row[0] for row in conn.execute('SELECT DISTINCT path FROM probes')]
+    missing = [(path,) for path in paths if not os.path.exists(path)]
+    conn.executemany('DELETE FROM probes WHERE path = ?', missing)
+    conn.commit()
+
+def _cached_media_info(key: tuple) -> Optional[Dict[str, Any]]:
+    """Look up an unexpired ffprobe result"""
+    with _ffprobe_cache_lock:
+        conn = _open_ffprobe_cache()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                'SELECT info FROM probes WHERE path = ? AND size = ? AND mtime_ns = ? AND created >= ?',
+                key + (time.time() - FFPROBE_CACHE_TTL,)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+    return _loads(row[0]) if row else None
+
+def _store_media_info(key: tuple, info: Dict[str, Any]) -> None:
+    """Remember an ffprobe result for the file version identified by key"""
+    global _ffprobe_cache_inserts
+    with _ffprobe_cache_lock:
+        conn = _open_ffprobe_cache()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?)',
+                key + (json.dumps(info), time.time())
+            )
+            conn.commit()
+            _ffprobe_cache_inserts += 1
+            if _ffprobe_cache_inserts % FFPROBE_CACHE_PURGE_EVERY == 0:
+                _purge_ffprobe_cache(conn)
+        except sqlite3.Error as e:
+            print(f"Warning: Could not cache media info for {key[0]}: {e}")
+
+@lru_cache(maxsize=1024)
+def _probe_duration(file_path: str, key: tuple) -> float:
+    """Probe the duration; key only ties the cached value to the file version"""
+    if _av is not None:
+        info = _probe_with_av(file_path)
+        if info is not None:
+            return info['duration']
+    
+    cmd = [*_DURATION_PROBE_CMD, file_path]
+    output = subprocess.check_output(cmd, stderr=subprocess.STDOUT, text=True)
+    return float(output.strip())
+
 def get_media_duration(file_path: str) -> Optional[float]:
     """Get the duration of a media file using ffprobe"""
-    cmd = [
-        'ffprobe', 
-        '-v', 'quiet',
-        '-show_entries', 'format=duration',
-        '-of', 'default=noprint_wrappers=1:nokey=1',
-        file_path
-    ]
     try:
-        output = subprocess.check_output(cmd, stderr=subprocess.STDOUT, text=True)
-        duration = float(output.strip())
-        return duration
+        return _probe_duration(file_path, _probe_cache_key(file_path))
     except (subprocess.CalledProcessError, ValueError, FileNotFoundError) as e:
         print(f"Error getting duration for {file_path}: {e}")
         return None
 
-def get_media_info(file_path: str) -> Optional[Dict[str, Any]]:
-    """Get comprehensive media file information using ffprobe"""
-    cmd = [
-        'ffprobe',
-        '-v', 'quiet',
-        '-print_format', 'json',
-        '-show_format',
-        '-show_streams',
-        file_path
-    ]
+def get_media_info(file_path: str, stat_result: Optional[os.stat_result] = None) -> Optional[Dict[str, Any]]:
+    """Get comprehensive media file information, probing only files not seen before
+    
+    Pass stat_result when the file has already been stat'd to skip another stat.
+    """
+    try:
+        key = _probe_cache_key(file_path, stat_result)
+    except OSError as e:
+        print(f"Error getting media info for {file_path}: {e}")
+        return None
+    
+    info = _cached_media_info(key)
+    if info is None:
+        info = _probe_media_info(file_path)
+        if info is not None:
+            _store_media_info(key, info)
+    return info
+
+def _probe_with_av(file_path: str) -> Optional[Dict[str, Any]]:
+    """Read media information in-process with PyAV, or None if it can't open the file"""
+    try:
+        with _av.open(file_path) as container:
+            audio_streams = container.streams.audio
+            video_streams = container.streams.video
+            audio = audio_streams[0].codec_context if audio_streams else None
+            video = video_streams[0].codec_context if video_streams else None
+            
+            return {
+                # Container durations are in AV_TIME_BASE (microsecond) units
+                'duration': container.duration / _av.time_base if container.duration else 0.0,
+                'size': container.size or 0,
+                'format_name': container.format.name,
+                'bit_rate': container.bit_rate or 0,
+                'audio_bit_rate': (audio.bit_rate or 0) if audio else 0,
+                'has_audio': audio is not None,
+                'has_video': video is not None,
+                'audio_codec': audio.name if audio else '',
+                'video_codec': video.name if video else '',
+                'sample_rate': (audio.sample_rate or 0) if audio else 0,
+                'channels': len(audio.layout.channels) if audio else 0
+            }
+    except (_av.error.FFmpegError, OSError, ValueError) as e:
+        print(f"PyAV could not probe {file_path}, falling back to ffprobe: {e}")
+        return None
+
+def _int_or_zero(value) -> int:
+    """Parse an optional ffprobe number, which may be missing or 'N/A'"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+def _probe_media_info(file_path: str) -> Optional[Dict[str, Any]]:
+    """Get comprehensive media file information using PyAV when installed, else ffprobe"""
+    if _av is not None:
+        info = _probe_with_av(file_path)
+        if info is not None:
+            return info
+    
+    cmd = [*_INFO_PROBE_CMD, file_path]
     try:
         output = subprocess.check_output(cmd, stderr=subprocess.STDOUT, text=True)
-        info = json.loads(output)
+        info = _loads(output)
         
         # Extract useful information
         format_info = info.get('format', {})
@@ -49,6 +231,8 @@ def get_media_info(file_path: str) -> Optional[Dict[str, Any]]:
             'size': int(format_info.get('size', 0)),
             'format_name': format_info.get('format_name', ''),
             'bit_rate': int(format_info.get('bit_rate', 0)),
+            # Some containers (e.g. Matroska) don't record a per-stream bitrate
+            'audio_bit_rate': _int_or_zero(audio_streams[0].get('bit_rate')) if audio_streams else 0,
             'has_audio': len(audio_streams) > 0,
             'has_video': len(video_streams) > 0,
             'audio_codec': audio_streams[0].get('codec_name', '') if audio_streams else '',
@@ -67,20 +251,18 @@ def format_duration(seconds: float) -> str:
     """Format duration in seconds to human-readable format"""
     if seconds < 60:
         return f"{seconds:.1f} seconds"
-    elif seconds < 3600:
-        minutes = seconds // 60
-        remaining_seconds = seconds % 60
-        return f"{int(minutes)}:{int(remaining_seconds):02d}"
-    else:
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
-        remaining_seconds = seconds % 60
-        return f"{int(hours)}:{int(minutes):02d}:{int(remaining_seconds):02d}"
+    
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, remaining_seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{remaining_seconds:02d}"
+    return f"{minutes}:{remaining_seconds:02d}"
 
+@ttl_cache(FFMPEG_CHECK_TTL)
 def is_ffmpeg_available() -> bool:
-    """Check if FFmpeg is available on the system"""
+    """Check if FFmpeg is available on the system (rechecked every few minutes)"""
     try:
-        subprocess.run(['ffprobe', '-version'], 
+        subprocess.run(_FFPROBE_VERSION_CMD, 
                       stdout=subprocess.DEVNULL, 
                       stderr=subprocess.DEVNULL, 
                       check=True)
@@ -88,9 +270,17 @@ def is_ffmpeg_available() -> bool:
     except (subprocess.CalledProcessError, FileNotFoundError):
         return False
 
-def traverse_and_analyze_media(directory: str) -> Dict[str, Dict[str, Any]]:
-    """Traverse directory and analyze all media files"""
-    valid_extensions = ('.mp3', '.mp4', '.wav', '.flac', '.avi', '.mov', '.m4a', '.aac', '.ogg', '.wma', '.wmv', '.flv', '.webm', '.mkv')
+def _extension(name: str) -> str:
+    """Lowercase extension of a file name including the dot, or '' if it has none"""
+    _, dot, ext = name.rpartition('.')
+    return dot + ext.lower() if dot else ''
+
+def traverse_and_analyze_media(directory: str, verbose: bool = True) -> Dict[str, Dict[str, Any]]:
+    """Traverse directory and analyze all media files
+    
+    With verbose=False the per-file report isn't printed, e.g. when the
+    results are returned from an API call instead.
+    """
     results = {}
     
     if not os.path.exists(directory):
@@ -98,48 +288,83 @@ def traverse_and_analyze_media(directory: str) -> Dict[str, Dict[str, Any]]:
         return results
     
     try:
-        for file in os.listdir(directory):
-            if file.lower().endswith(valid_extensions):
-                file_path = os.path.join(directory, file)
-                print(f"Analyzing {file}...")
+        with os.scandir(directory) as entries:
+            media_entries = [
+                entry for entry in entries
+                # is_file() uses the cached dirent type, only symlinks cost a stat
+                if _extension(entry.name) in _VALID_EXT_SET and entry.is_file()
+            ]
+        files = [entry.name for entry in media_entries]
+        file_paths = [entry.path for entry in media_entries]
+        # DirEntry caches its stat, so the cache lookups don't stat each file again
+        stat_results = [entry.stat() for entry in media_entries]
+        
+        # Probes run in an ffprobe child process or in PyAV, which releases the
+        # GIL while demuxing, so threads are enough to run them side by side
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+            media_infos = list(executor.map(get_media_info, file_paths, stat_results))
+        
+        for file, file_path, media_info in zip(files, file_paths, media_infos):
+            if media_info:
+                media_info['filename'] = file
+                media_info['file_path'] = file_path
+                media_info['formatted_duration'] = format_duration(media_info['duration'])
+                results[file] = media_info
+            
+            if not verbose:
+                continue
+            
+            print(f"Analyzing {file}...")
+            if media_info:
+                print(f"  Duration: {media_info['formatted_duration']}")
+                print(f"  Size: {media_info['size'] / (1024*1024):.1f} MB")
+                print(f"  Format: {media_info['format_name']}")
+                if media_info['has_audio']:
+                    print(f"  Audio: {media_info['audio_codec']}, {media_info['sample_rate']}Hz, {media_info['channels']} channels")
+                if media_info['has_video']:
+                    print(f"  Video: {media_info['video_codec']}")
+                print()
+            else:
+                print(f"  Could not analyze {file}")
                 
-                media_info = get_media_info(file_path)
-                if media_info:
-                    media_info['filename'] = file
-                    media_info['file_path'] = file_path
-                    media_info['formatted_duration'] = format_duration(media_info['duration'])
-                    results[file] = media_info
-                    
-                    print(f"  Duration: {media_info['formatted_duration']}")
-                    print(f"  Size: {media_info['size'] / (1024*1024):.1f} MB")
-                    print(f"  Format: {media_info['format_name']}")
-                    if media_info['has_audio']:
-                        print(f"  Audio: {media_info['audio_codec']}, {media_info['sample_rate']}Hz, {media_info['channels']} channels")
-                    if media_info['has_video']:
-                        print(f"  Video: {media_info['video_codec']}")
-                    print()
-                else:
-                    print(f"  Could not analyze {file}")
-                    
     except Exception as e:
         print(f"Error traversing directory {directory}: {e}")
     
     return results
 
-def run_command_with_output(cmd, desc=None):
-    """Run a command and stream its output in real-time"""
+def run_command_with_output(cmd, desc=None, quiet=False):
+    """Run a command and stream its output in real-time
+    
+    With quiet=True nothing is streamed; the command's error output is only
+    printed if it fails.
+    """
     if desc:
         print(f"\n{desc}")
     
+    if quiet:
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            print(result.stderr.decode(errors='replace'), end='')
+            raise subprocess.CalledProcessError(result.returncode, cmd, stderr=result.stderr)
+        return
+    
     process = subprocess.Popen(
         cmd,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
-        universal_newlines=True
+        bufsize=0
     )
     
-    for line in iter(process.stdout.readline, ''):
-        print(line, end='')
+    # Pass the output through as raw bytes in large reads; ffmpeg's progress
+    # lines don't need decoding or splitting just to be echoed
+    sys.stdout.flush()
+    out = getattr(sys.stdout, 'buffer', None)
+    for chunk in iter(partial(os.read, process.stdout.fileno(), 65536), b''):
+        if out is not None:
+            out.write(chunk)
+            out.flush()
+        else:
+            print(chunk.decode(errors='replace'), end='', flush=True)
     
     process.stdout.close()
     return_code = process.wait()
@@ -147,76 +372,289 @@ def run_command_with_output(cmd, desc=None):
     if return_code != 0:
         raise subprocess.CalledProcessError(return_code, cmd)
 
-def split_media(file_path: str, chunk_size_mb: int = 20) -> List[str]:
-    """Split media file into chunks smaller than the API limit"""
+def _chunk_commands(file_path: str, start_time: float, chunk_duration: float,
+                    threads: int, output_path: str) -> List[List[str]]:
+    """ffmpeg commands that cut one chunk, in the order they should be tried"""
+    output_args = [
+        '-v', 'error',  # Only report problems; progress from parallel chunks isn't read
+        '-t', str(chunk_duration),  # Define the chunk's duration
+        '-c', 'copy',   # Copy streams without re-encoding for efficiency
+        '-avoid_negative_ts', 'make_zero',  # Start each chunk's timestamps at zero
+        '-threads', str(threads),  # Share the CPUs with the other chunk workers
+        '-y',   # Overwrite output files without confirmation
+        output_path
+    ]
+    # Seeking on the input jumps straight to the keyframe before start_time
+    # using the container index, instead of demuxing everything before it
+    seek_cmd = [
+        'ffmpeg',
+        '-ss', str(start_time),  # Set the start time of the chunk
+        '-noaccurate_seek',  # Cut on the keyframe rather than decoding up to start_time
+        '-i', file_path,    # Specify the input file to process
+    ] + output_args
+    # Containers without a seek index can only be cut by reading up to the start
+    scan_cmd = [
+        'ffmpeg',
+        '-i', file_path,
+        '-ss', str(start_time),
+    ] + output_args
+    return [seek_cmd, scan_cmd]
+
+def _run_job_threaded(commands: List[List[str]]) -> None:
+    """Try each command in turn until one succeeds, re-raising the last failure"""
+    for attempt, cmd in enumerate(commands, start=1):
+        try:
+            return run_command_with_output(cmd, quiet=True)
+        except subprocess.CalledProcessError:
+            if attempt == len(commands):
+                raise
+
+def _iter_ffmpeg_jobs(jobs: List[List[List[str]]], max_running: int):
+    """Run ffmpeg jobs with at most max_running processes at once
+    
+    Each job's commands are tried in order; yields (job index, exception or None) as jobs finish.
+    """
+    if sys.platform == 'win32':
+        # select() on Windows only works with sockets, not pipes
+        with ThreadPoolExecutor(max_workers=max_running) as executor:
+            futures = {executor.submit(_run_job_threaded, job): i for i, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                yield futures[future], future.exception()
+        return
+    
+    pending = deque(enumerate(jobs))
+    
+    with selectors.DefaultSelector() as selector:
+        def start(index, commands):
+            process = subprocess.Popen(commands[0], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            selector.register(process.stderr, selectors.EVENT_READ, (index, commands, process, []))
+        
+        try:
+            while pending or selector.get_map():
+                while pending and len(selector.get_map()) < max_running:
+                    start(*pending.popleft())
+                
+                for key, _ in selector.select():
+                    index, commands, process, output = key.data
+                    data = os.read(key.fd, 65536)
+                    if data:
+                        output.append(data)
+                        continue
+                    
+                    # EOF: the process has exited or is about to
+                    selector.unregister(key.fileobj)
+                    process.stderr.close()
+                    return_code = process.wait()
+                    if return_code == 0:
+                        yield index, None
+                        continue
+                    if len(commands) > 1:
+                        print(f"Job {index+1} failed with code {return_code}, trying its fallback command")
+                        start(index, commands[1:])
+                        continue
+                    
+                    stderr = b''.join(output)
+                    print(stderr.decode(errors='replace'), end='')
+                    yield index, subprocess.CalledProcessError(return_code, commands[0], stderr=stderr)
+        finally:
+            # Don't leave ffmpeg running if we're bailing out early
+            for key in list(selector.get_map().values()):
+                process = key.data[2]
+                process.kill()
+                process.stderr.close()
+                process.wait()
+
+def ffmpeg_threads() -> int:
+    """Threads per ffmpeg process, from TRANSCRIBER_FFMPEG_THREADS (default 2)
+    
+    Chunks are stream-copied rather than encoded, so 1-2 threads per process
+    is enough and leaves the CPUs for running more chunks side by side.
+    """
+    value = os.environ.get('TRANSCRIBER_FFMPEG_THREADS', '2')
+    try:
+        threads = int(value)
+    except ValueError:
+        raise ValueError(f"TRANSCRIBER_FFMPEG_THREADS must be an integer, got {value!r}")
+    if not 1 <= threads <= 64:
+        raise ValueError(f"TRANSCRIBER_FFMPEG_THREADS must be between 1 and 64, got {threads}")
+    return threads
+
+# /dev/shm is used for chunks only when it would have this much left over. This also
+# rules out small tmpfs mounts such as Docker's default 64MB one
+SHM_MIN_FREE = 256 * 1024 * 1024  # 256MB
+SHM_HEADROOM_FACTOR = 2
+
+def chunk_dir(required_bytes: int) -> Optional[str]:
+    """Directory for split_media chunks, or None for the system temp directory
+    
+    TRANSCRIBER_CHUNK_DIR wins when set. Otherwise chunks go to the /dev/shm
+    tmpfs when it has room to spare, since they are read straight back for
+    upload and never need to touch the disk.
+    """
+    configured = os.environ.get('TRANSCRIBER_CHUNK_DIR')
+    if configured:
+        os.makedirs(configured, exist_ok=True)
+        return configured
+    
+    try:
+        st = os.statvfs('/dev/shm')
+    except (AttributeError, OSError):
+        # No statvfs on Windows, or no /dev/shm
+        return None
+    # Chunks of other jobs may still be waiting to upload, and running out of
+    # space mid-split fails the job, so only use tmpfs with plenty to spare
+    if st.f_bavail * st.f_frsize >= SHM_HEADROOM_FACTOR * required_bytes + SHM_MIN_FREE:
+        return '/dev/shm'
+    return None
+
+def iter_split_media(file_path: str, chunk_size_mb: int = 20, st_size: Optional[int] = None,
+                     threads: Optional[int] = None):
+    """Split media file into chunks, yielding (index, chunk_path, seconds) as each one is ready
+    
+    Chunks may arrive out of order; yielded ones belong to the caller and the rest are removed on failure or close.
+    """
     print("\nSplitting media into chunks...")
     
-    duration = get_media_duration(file_path)
-    if not duration:
+    # One (usually cached) probe gives both the duration and the size
+    info = get_media_info(file_path)
+    if not info or not info['duration']:
         raise Exception("Could not determine audio duration")
     
-    file_size = os.path.getsize(file_path)
+    duration = info['duration']
+    # Some containers don't report a size; fall back to the filesystem's
+    file_size = info['size'] or (st_size if st_size is not None else os.path.getsize(file_path))
     chunk_duration = duration * (chunk_size_mb * 1024 * 1024) / file_size
     num_chunks = math.ceil(duration / chunk_duration)
     
+    # Chunks are independent, so extract them side by side. Only as many run
+    # at once as fit on the CPUs with their threads, to avoid oversubscribing.
+    if threads is None:
+        threads = ffmpeg_threads()
+    cpu_count = os.cpu_count() or 1
+    workers = max(1, min(cpu_count // threads, num_chunks))
+    
+    # The chunks add up to about the size of the input
+    output_dir = chunk_dir(file_size)
     chunks = []
-    for i in range(num_chunks):
-        start_time = i * chunk_duration
+    for _ in range(num_chunks):
         temp_file = tempfile.NamedTemporaryFile(
             delete=False,
-            suffix=os.path.splitext(file_path)[1]
-        )
-        
-        cmd = [
-            'ffmpeg',
-            '-i', file_path,    # Specify the input file to process
-            '-ss', str(start_time),  # Set the start time of the chunk
-            '-t', str(chunk_duration),  # Define the chunk's duration
-            '-c', 'copy',   # Copy streams without re-encoding for efficiency
-            '-y',   # Overwrite output files without confirmation
-            temp_file.name
-        ]
-        
-        run_command_with_output(
-            cmd, 
-            f"Extracting chunk {i+1}/{num_chunks}"
+            suffix=os.path.splitext(file_path)[1],
+            dir=output_dir
         )
+        temp_file.close()
         chunks.append(temp_file.name)
     
+    jobs = [
+        _chunk_commands(file_path, i * chunk_duration, chunk_duration, threads, chunk)
+        for i, chunk in enumerate(chunks)
+    ]
+    print(f"Extracting {num_chunks} chunk(s), {workers} at a time")
+    
+    results = _iter_ffmpeg_jobs(jobs, workers)
+    yielded = set()
+    try:
+        for index, error in results:
+            if error is not None:
+                raise error
+            yielded.add(index)
+            # Every chunk is full length except possibly the last
+            seconds = min(chunk_duration, duration - index * chunk_duration)
+            yield index, chunks[index], seconds
+    finally:
+        results.close()
+        cleanup_temp_files([chunk for i, chunk in enumerate(chunks) if i not in yielded])
+
+def split_media(file_path: str, chunk_size_mb: int = 20, st_size: Optional[int] = None,
+                threads: Optional[int] = None) -> List[str]:
+    """Split media file into chunks smaller than the API limit
+    
+    Returns the chunk paths in order once every chunk is done; see
+    iter_split_media to use chunks as soon as they're ready.
+    """
+    chunks = {}
+    try:
+        for index, chunk, _ in iter_split_media(file_path, chunk_size_mb, st_size, threads):
+            chunks[index] = chunk
+    except Exception:
+        cleanup_temp_files(list(chunks.values()))
+        raise
+    
+    chunks = [chunks[i] for i in sorted(chunks)]
     print(f"Split media into {len(chunks)} chunk(s): {chunks}")
     return chunks
 
+# Start and end times in ffmpeg's silencedetect log lines
+_SILENCE_RE = re.compile(rb'silence_(start|end): (-?[\d.]+)')
+
+def is_silent(file_path: str, duration: float, min_duration: float = 0.5,
+              noise: str = '-40dB') -> bool:
+    """Check with ffmpeg's silencedetect whether a file has under min_duration seconds of sound
+    
+    This decodes the whole file, so it's meant for short files. Returns False
+    when the file can't be checked, so it still gets transcribed.
+    """
+    cmd = [
+        'ffmpeg', '-hide_banner', '-nostats', '-i', file_path, '-vn',
+        '-af', f'silencedetect=noise={noise}:d={min_duration}', '-f', 'null', '-'
+    ]
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        return False
+    if result.returncode != 0:
+        return False
+    
+    # Add up the silent stretches; a start with no matching end runs to the end of the file
+    silent = 0.0
+    start = None
+    for kind, value in _SILENCE_RE.findall(result.stderr):
+        if kind == b'start':
+            start = max(0.0, float(value))
+        elif start is not None:
+            silent += float(value) - start
+            start = None
+    if start is not None:
+        silent += duration - start
+    
+    return duration - silent < min_duration
+
 def cleanup_temp_files(file_paths) -> None:
     """Clean up temporary files and directories"""
-    # Handle both single file and list of files
-    if isinstance(file_paths, str):
-        file_paths = [file_paths]
-    elif not isinstance(file_paths, (list, tuple)):
-        file_paths = [file_paths]
+    # Handle both a single path and a collection of paths
+    if isinstance(file_paths, (str, bytes, os.PathLike)):
+        file_paths = (file_paths,)
     
+    cleaned = []
     for file_path in file_paths:
         try:
             if os.path.isfile(file_path):
                 os.unlink(file_path)
-                print(f"Cleaned up file: {file_path}")
+                cleaned.append(f"Cleaned up file: {file_path}")
             elif os.path.isdir(file_path):
-                for root, dirs, files in os.walk(file_path, topdown=False):
-                    for name in files:
-                        os.unlink(os.path.join(root, name))
-                    for name in dirs:
-                        os.rmdir(os.path.join(root, name))
-                os.rmdir(file_path)
-                print(f"Cleaned up directory: {file_path}")
+                shutil.rmtree(file_path)
+                cleaned.append(f"Cleaned up directory: {file_path}")
         except Exception as e:
-            print(f"Warning: Could not clean up {file_path}: {e}")
+            cleaned.append(f"Warning: Could not clean up {file_path}: {e}")
+    
+    if cleaned:
+        print('\n'.join(cleaned))
+
+def get_file_size_mb(file_path: str, st_size: Optional[int] = None) -> float:
+    """Get file size in MB, using st_size instead of a stat when it's known"""
+    if st_size is None:
+        st_size = os.path.getsize(file_path)
+    return st_size / (1024 * 1024)
 
-def get_file_size_mb(file_path: str) -> float:
-    """Get file size in MB"""
-    return os.path.getsize(file_path) / (1024 * 1024)
+def needs_splitting_stat(st_size: int, max_size_mb: int = 25) -> bool:
+    """Check if a file of st_size bytes needs to be split"""
+    return st_size > max_size_mb * 1024 * 1024
 
-def needs_splitting(file_path: str, max_size_mb: int = 25) -> bool:
+def needs_splitting(file_path: str, max_size_mb: int = 25, st_size: Optional[int] = None) -> bool:
     """Check if file needs to be split based on size"""
-    return get_file_size_mb(file_path) > max_size_mb
+    if st_size is None:
+        st_size = os.path.getsize(file_path)
+    return needs_splitting_stat(st_size, max_size_mb)
 
 if __name__ == "__main__":
     # Check if FFmpeg is available
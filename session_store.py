@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class SessionStore:
+    """In-memory per-session state that expires after a period without requests
+
+    Sessions are kept least recently used first, so expiry only has to look at
+    the front of the queue. A session whose `is_busy` check returns True (for
+    example, one with a transcription still running) is kept alive rather than
+    expired out from under its job.
+    """
+
+    def __init__(self, ttl, maxsize=10000, on_expire=None, is_busy=None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.on_expire = on_expire
+        self.is_busy = is_busy
+        self._sessions = OrderedDict()  # session_id -> (last_seen, data)
+        self._lock = threading.RLock()
+
+    def __contains__(self, session_id):
+        with self._lock:
+            return session_id in self._sessions
+
+    def __getitem__(self, session_id):
+        with self._lock:
+            return self._sessions[session_id][1]
+
+    def __setitem__(self, session_id, data):
+        with self._lock:
+            self._sessions[session_id] = (time.monotonic(), data)
+            self._sessions.move_to_end(session_id)
+        self._evict_overflow()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def touch(self, session_id, factory):
+        """Return a session's data, creating it with factory() if needed, and refresh its TTL"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            data = entry[1] if entry else factory()
+            self._sessions[session_id] = (time.monotonic(), data)
+            self._sessions.move_to_end(session_id)
+        if entry is None:
+            self._evict_overflow()
+        return data
+
+    def expire(self):
+        """Drop sessions idle for longer than the TTL and return how many were removed"""
+        cutoff = time.monotonic() - self.ttl
+        expired = []
+        with self._lock:
+            while self._sessions:
+                session_id, (last_seen, data) = next(iter(self._sessions.items()))
+                if last_seen > cutoff:
+                    break
+                if self.is_busy and self.is_busy(data):
+                    self._sessions[session_id] = (time.monotonic(), data)
+                    self._sessions.move_to_end(session_id)
+                    continue
+                del self._sessions[session_id]
+                expired.append(data)
+
+        self._notify(expired)
+        return len(expired)
+
+    def start_cleanup(self, interval):
+        """Expire idle sessions every `interval` seconds on a daemon thread"""
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    removed = self.expire()
+                    if removed:
+                        print(f"Expired {removed} idle session(s)")
+                except Exception as e:
+                    print(f"Error expiring sessions: {e}")
+
+        thread = threading.Thread(target=run, name='session-cleanup', daemon=True)
+        thread.start()
+        return thread
+
+    def _evict_overflow(self):
+        """Drop the least recently used idle sessions beyond maxsize"""
+        evicted = []
+        with self._lock:
+            excess = len(self._sessions) - self.maxsize
+            if excess > 0:
+                # Busy sessions are passed over, so the store can briefly exceed
+                # maxsize rather than lose a running job's session
+                for session_id, (_, data) in list(self._sessions.items()):
+                    if excess <= 0:
+                        break
+                    if self.is_busy and self.is_busy(data):
+                        continue
+                    del self._sessions[session_id]
+                    evicted.append(data)
+                    excess -= 1
+        self._notify(evicted)
+
+    def _notify(self, removed):
+        """Run the expiry callback outside the lock, since it may touch the filesystem"""
+        if self.on_expire:
+            for data in removed:
+                self.on_expire(data)
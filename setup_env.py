@@ -31,16 +31,11 @@ def setup_env_file():
     api_key = input("\nPlease enter your OpenAI API key: ").strip()
     
     if api_key:
-        # Read the .env file
-        with open(env_path, 'r') as f:
-            content = f.read()
-        
-        # Replace the placeholder with actual API key
-        content = content.replace('your_openai_api_key_here', api_key)
-        
-        # Write back to .env file
-        with open(env_path, 'w') as f:
-            f.write(content)
+        # Rewrite .env from the example line by line, replacing the placeholder
+        # with the actual API key
+        with open(env_example_path, 'r') as src, open(env_path, 'w') as dst:
+            for line in src:
+                dst.write(line.replace('your_openai_api_key_here', api_key))
         
         print(f"\nOpenAI API key has been set in {env_path}")
         print("✅ Environment setup complete!")
@@ -0,0 +1,57 @@
+# Run from the repository root with: python -m unittest discover -s tests
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+# The OpenAI client is created at import time and needs a key, though no request is sent
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+import app
+import main
+
+
+class RetryTest(unittest.TestCase):
+    def setUp(self):
+        # Skip the backoff waits
+        patcher = mock.patch('decorators.retry.time.sleep')
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        audio = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
+        audio.close()
+        self.audio_path = audio.name
+        self.addCleanup(os.unlink, audio.name)
+
+    def test_transcribe_retries_until_success(self):
+        with mock.patch('app.client') as client:
+            create = client.audio.transcriptions.create
+            create.side_effect = [ValueError('boom'), ValueError('boom'), 'text']
+
+            self.assertEqual(app.transcribe(self.audio_path), 'text')
+
+        self.assertEqual(create.call_count, 3)
+        self.assertEqual(self.sleep.call_count, 2)
+
+    def test_transcribe_raises_after_last_attempt(self):
+        with mock.patch('app.client') as client:
+            create = client.audio.transcriptions.create
+            create.side_effect = ValueError('boom')
+
+            with self.assertRaises(Exception) as raised:
+                app.transcribe(self.audio_path)
+
+        self.assertEqual(create.call_count, 3)
+        self.assertIsInstance(raised.exception.__cause__, ValueError)
+
+    def test_transcribe_remote_retries_download_errors(self):
+        with mock.patch('main.download_to_spool', side_effect=OSError('connection reset')) as download:
+            with self.assertRaises(Exception) as raised:
+                main.transcribe_remote('https://example.com/video.mp4')
+
+        self.assertEqual(download.call_count, 3)
+        self.assertIn('Remote transcription failed', str(raised.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
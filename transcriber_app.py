@@ -1,35 +1,43 @@
 from flask import Flask, request, jsonify, render_template, session, send_file
 from flask_cors import CORS
 import os
+import io
 import uuid
 from werkzeug.utils import secure_filename
-from functools import wraps
-import time
-import requests
-import io
+from werkzeug.exceptions import RequestEntityTooLarge
+import shutil
 from datetime import datetime
-# from openai import OpenAI
-import openai
+import httpx
 from dotenv import load_dotenv
 import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from urllib.parse import urlparse
 from media_utils import (get_media_info, format_duration, is_ffmpeg_available, 
-                         traverse_and_analyze_media, split_media, cleanup_temp_files, 
-                         needs_splitting, get_file_size_mb)
+                         traverse_and_analyze_media, iter_split_media, cleanup_temp_files, 
+                         needs_splitting_stat, get_file_size_mb, is_silent)
 from external_services import (GoogleDriveService, LinkedInService, MediaProcessorService, 
                               URLService, check_dependencies)
+from decorators.retry import retry
+from clients import get_openai
+from session_store import SessionStore
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
-openai.api_key = os.getenv('OPENAI_API_KEY')
 print("Initializing OpenAI client...")
-# print(f"OpenAI API Key: {openai.api_key}")
-if not openai.api_key:
+if not os.getenv('OPENAI_API_KEY'):
     raise ValueError("OpenAI API key not set. Please set the OPENAI_API_KEY environment variable.")
 else: 
     print("OpenAI API key loaded successfully.")
+
+# One client for every Whisper call, so chunk uploads reuse pooled connections
+# instead of paying a TLS handshake each. Retries are left to @retry so its
+# backoff isn't stacked on the SDK's own; long uploads get a generous timeout.
+client = get_openai().with_options(
+    max_retries=0,
+    timeout=httpx.Timeout(600.0, connect=10.0)
+)
 app.secret_key = os.getenv('SECRET_KEY', 'your-secret-key-change-this')
 CORS(app)
 
@@ -40,6 +48,25 @@ ALLOWED_EXTENSIONS = {
     'video': ['mp4', 'avi', 'mov', 'wmv', 'flv', 'webm', 'mkv']
 }
 MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 100 * 1024 * 1024))  # 100MB
+# Chunk uploads to Whisper in flight across all jobs; lower it if you hit rate limits
+WHISPER_CHUNK_PARALLELISM = max(1, int(os.getenv('WHISPER_CHUNK_PARALLELISM', 8)))
+UPLOAD_COPY_SIZE = 1024 * 1024  # 1MB
+# Chunks shorter than this (seconds) have nothing worth sending to Whisper
+MIN_CHUNK_DURATION = 0.5
+# Chunks up to this long (seconds), usually the tail of a split, are checked for
+# silence and skipped if silent; set SILENCE_CHECK_ALL_CHUNKS=true to check every chunk
+SILENCE_CHECK_MAX_DURATION = 60
+SILENCE_CHECK_ALL_CHUNKS = os.getenv('SILENCE_CHECK_ALL_CHUNKS', 'false').lower() == 'true'
+# Read buffer for files sent to Whisper; httpx streams the multipart body from it
+WHISPER_READ_BUFFER = 4 * 1024 * 1024  # 4MB
+# Background jobs run on one bounded pool; extra jobs wait as 'queued'
+TRANSCRIPTION_WORKERS = max(1, int(os.getenv('TRANSCRIPTION_WORKERS', 4)))
+# Sessions idle this long are dropped together with their transcription files
+SESSION_TTL = int(os.getenv('SESSION_TTL', 24 * 60 * 60))  # 1 day
+SESSION_CLEANUP_INTERVAL = 10 * 60  # 10 minutes
+MAX_SESSIONS = 10000
+# Transcripts up to this size are downloaded straight from memory instead of disk
+INLINE_DOWNLOAD_LIMIT = 4 * 1024 * 1024  # 4MB
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
@@ -48,30 +75,58 @@ app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs('transcriptions', exist_ok=True)
 
-# Initialize OpenAI client
-# client = openai.OpenAI()
+def new_session_data():
+    """Empty state for a new or reset session"""
+    # Transcriptions are keyed by job_id; dicts keep insertion order for listing
+    # The lock guards both dicts and the job/transcription entries inside them,
+    # which background jobs update while request threads read them
+    return {
+        'transcriptions_by_id': {},
+        'processing_jobs': {},
+        'lock': threading.Lock(),
+        # Bumped on every change so the listing response can be reused between polls
+        'version': 0,
+        'listing_cache': None  # (version, JSON body)
+    }
 
-# Global dictionary to store user sessions
-user_sessions = {}
+def session_changed(user_data):
+    """Record a change to a session's jobs or transcriptions; call with its lock held"""
+    user_data['version'] += 1
 
-# Retry decorator
-def retry_on_error(max_retries=3, delay=1):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            retries = 0
-            while retries < max_retries:
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    retries += 1
-                    if retries == max_retries:
-                        raise
-                    print(f"Error: {e}. Retrying in {delay} seconds...")
-                    time.sleep(delay)
-            return None
-        return wrapper
-    return decorator
+def remove_transcription_files(user_data):
+    """Delete the saved transcription files belonging to a session"""
+    with user_data['lock']:
+        transcriptions = list(user_data['transcriptions_by_id'].values())
+    for transcription in transcriptions:
+        try:
+            if 'file_path' in transcription and os.path.exists(transcription['file_path']):
+                os.remove(transcription['file_path'])
+        except Exception as e:
+            print(f"Error deleting transcription file: {e}")
+
+def session_has_active_jobs(user_data):
+    """Whether any of a session's jobs are still queued or running"""
+    with user_data['lock']:
+        return any(job['status'] not in ('completed', 'failed')
+                   for job in user_data['processing_jobs'].values())
+
+# User sessions, dropped along with their transcription files once idle for SESSION_TTL
+user_sessions = SessionStore(
+    ttl=SESSION_TTL,
+    maxsize=MAX_SESSIONS,
+    on_expire=remove_transcription_files,
+    is_busy=session_has_active_jobs
+)
+user_sessions.start_cleanup(SESSION_CLEANUP_INTERVAL)
+
+# Shared pool for background transcription jobs, instead of a thread per request
+job_executor = ThreadPoolExecutor(max_workers=TRANSCRIPTION_WORKERS, thread_name_prefix='transcription')
+# Chunk uploads from every job share one network pool, so concurrent jobs can't
+# multiply the load on the OpenAI rate limit
+chunk_executor = ThreadPoolExecutor(max_workers=WHISPER_CHUNK_PARALLELISM, thread_name_prefix='whisper')
+# Splitting already runs ffmpeg across all CPUs, so splits from different
+# jobs take turns rather than oversubscribing the machine
+split_lock = threading.Lock()
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
@@ -93,55 +148,71 @@ def get_or_create_session():
         session['session_id'] = str(uuid.uuid4())
     
     session_id = session['session_id']
-    if session_id not in user_sessions:
-        user_sessions[session_id] = {
-            'transcriptions': [],
-            'processing_jobs': {}
-        }
+    # Every request keeps the session alive for another SESSION_TTL
+    user_sessions.touch(session_id, new_session_data)
     
     return session_id
 
-@retry_on_error(max_retries=3, delay=2)
+@retry(max_attempts=3, base_delay=2)
 def transcribe_file_chunk(file_path, job_id=None):
     """Transcribe a single audio/video file chunk using OpenAI Whisper"""
     try:
-        with open(file_path, 'rb') as audio_file:
-            transcript = openai.audio.transcriptions.create(
+        with open(file_path, 'rb', buffering=WHISPER_READ_BUFFER) as audio_file:
+            transcript = client.audio.transcriptions.create(
                 model="whisper-1",
                 file=audio_file,
                 response_format="text"
             )
             return transcript
     except Exception as e:
-        raise Exception(f"Chunk transcription failed: {str(e)}")
+        raise Exception(f"Chunk transcription failed: {str(e)}") from e
+
+def transcribe_audible_chunk(file_path, duration, job_id=None):
+    """Transcribe a split chunk of `duration` seconds, skipping the Whisper call if it is empty or silent"""
+    if duration < MIN_CHUNK_DURATION:
+        print(f"Skipping empty chunk {file_path}")
+        return ""
+    
+    # Decoding for silence costs a full pass, so only short chunks get it by default
+    check_silence = SILENCE_CHECK_ALL_CHUNKS or duration <= SILENCE_CHECK_MAX_DURATION
+    if check_silence and is_silent(file_path, duration, MIN_CHUNK_DURATION):
+        print(f"Skipping silent chunk {file_path}")
+        return ""
+    return transcribe_file_chunk(file_path, job_id)
 
 def transcribe_file(file_path, job_id=None):
     """Transcribe an audio/video file, splitting if necessary for large files"""
     try:
         # Check if file needs splitting (25MB limit for Whisper API)
-        if needs_splitting(file_path, max_size_mb=25):
-            print(f"File {file_path} is {get_file_size_mb(file_path):.1f}MB, splitting for transcription...")
+        file_size = os.path.getsize(file_path)
+        if needs_splitting_stat(file_size, max_size_mb=25):
+            print(f"File {file_path} is {get_file_size_mb(file_path, file_size):.1f}MB, splitting for transcription...")
             
             if not is_ffmpeg_available():
                 raise Exception("FFmpeg is required for splitting large files but is not available")
             
-            # Split the file into chunks
-            chunks = split_media(file_path, chunk_size_mb=20)
-            transcripts = []
+            chunks = {}
+            futures = {}
             
             try:
-                # Transcribe each chunk
-                for i, chunk_path in enumerate(chunks):
-                    print(f"Transcribing chunk {i+1}/{len(chunks)}...")
-                    chunk_transcript = transcribe_file_chunk(chunk_path, job_id)
-                    transcripts.append(chunk_transcript)
-                    
-                # Combine all transcripts
-                combined_transcript = " ".join(transcripts)
+                # Each chunk goes to Whisper as soon as ffmpeg finishes it, so
+                # uploads overlap with splitting the rest of the file
+                with split_lock:
+                    for index, chunk_path, seconds in iter_split_media(file_path, chunk_size_mb=20, st_size=file_size):
+                        print(f"Transcribing chunk {index+1}...")
+                        chunks[index] = chunk_path
+                        futures[index] = chunk_executor.submit(transcribe_audible_chunk, chunk_path, seconds, job_id)
+                
+                # Combine all transcripts in chunk order, leaving out skipped chunks
+                transcripts = [futures[i].result() for i in sorted(futures)]
+                combined_transcript = " ".join(t for t in transcripts if t)
                 
             finally:
-                # Clean up temporary chunk files
-                cleanup_temp_files(chunks)
+                # Let uploads still reading a chunk finish, then clean up the chunk files
+                for future in futures.values():
+                    future.cancel()
+                wait(futures.values())
+                cleanup_temp_files(list(chunks.values()))
                 
             return combined_transcript
         else:
@@ -151,35 +222,53 @@ def transcribe_file(file_path, job_id=None):
     except Exception as e:
         raise Exception(f"Transcription failed: {str(e)}")
 
-@retry_on_error(max_retries=3, delay=2)
+@retry(max_attempts=3, base_delay=2)
 def transcribe_from_url(url, job_id=None):
     """Transcribe an audio/video file from URL using OpenAI Whisper"""
+    temp_path = None
     try:
-        response = requests.get(url, stream=True, timeout=60)
-        response.raise_for_status()
-        
-        # Create a BytesIO object from the response content
-        audio_data = io.BytesIO(response.content)
-        
         # Get filename from URL or use default
         parsed_url = urlparse(url)
         filename = os.path.basename(parsed_url.path) or 'audio_from_url'
-        audio_data.name = filename
         
-        transcript = openai.audio.transcriptions.create(
-            model="whisper-1",
-            file=audio_data,
-            response_format="text"
-        )
+        # The download runs on the shared background loop; this thread only waits
+        temp_path = URLService.submit_download(url).result()
+        if '.' not in filename:
+            # Whisper needs an extension; use the one picked from Content-Type
+            filename += os.path.splitext(temp_path)[1]
+        
+        with open(temp_path, 'rb', buffering=WHISPER_READ_BUFFER) as audio_file:
+            transcript = client.audio.transcriptions.create(
+                model="whisper-1",
+                file=(filename, audio_file),
+                response_format="text"
+            )
         return transcript
     except Exception as e:
-        raise Exception(f"URL transcription failed: {str(e)}")
+        raise Exception(f"URL transcription failed: {str(e)}") from e
+    finally:
+        if temp_path:
+            os.unlink(temp_path)
+
+def save_transcription(job_id, text):
+    """Write a transcription to the transcriptions folder and return its path"""
+    transcription_file = f'transcriptions/{job_id}.txt'
+    # Encode once and hand the whole buffer to a single binary write, rather
+    # than going through the text layer's encoder and buffer in pieces
+    with open(transcription_file, 'wb', buffering=0) as f:
+        data = memoryview(text.encode('utf-8'))
+        while data:
+            data = data[f.write(data):]
+    return transcription_file
 
 def process_transcription_async(session_id, job_id, file_path=None, url=None, filename=None):
     """Process transcription in background thread"""
+    user_data = None
     try:
         user_data = user_sessions[session_id]
-        user_data['processing_jobs'][job_id]['status'] = 'processing'
+        with user_data['lock']:
+            user_data['processing_jobs'][job_id]['status'] = 'processing'
+            session_changed(user_data)
         
         # Transcribe based on source
         if file_path:
@@ -200,36 +289,111 @@ def process_transcription_async(session_id, job_id, file_path=None, url=None, fi
         }
         
         # Save to file
-        transcription_file = f'transcriptions/{job_id}.txt'
-        with open(transcription_file, 'w', encoding='utf-8') as f:
-            f.write(result)
+        transcription_file = save_transcription(job_id, result)
         
         transcription_data['file_path'] = transcription_file
         
         # Update session data
-        user_data['transcriptions'].append(transcription_data)
-        user_data['processing_jobs'][job_id] = transcription_data
+        with user_data['lock']:
+            user_data['transcriptions_by_id'][job_id] = transcription_data
+            user_data['processing_jobs'][job_id] = transcription_data
+            session_changed(user_data)
         
     except Exception as e:
+        if user_data is None:
+            # No session left to record the failure in
+            print(f"Job {job_id} failed: session {session_id} no longer exists")
+            return
+        
         # Update job status with error
-        if session_id in user_sessions and job_id in user_sessions[session_id]['processing_jobs']:
-            user_sessions[session_id]['processing_jobs'][job_id].update({
-                'status': 'failed',
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            })
+        with user_data['lock']:
+            if job_id in user_data['processing_jobs']:
+                user_data['processing_jobs'][job_id].update({
+                    'status': 'failed',
+                    'error': str(e),
+                    'timestamp': datetime.now().isoformat()
+                })
+                session_changed(user_data)
 
 @app.route('/')
 def index():
     """Serve the main page"""
     return render_template('transcriber.html')
 
+def start_upload_job(session_id, file_path, filename, file_type):
+    """Analyze a saved upload, queue its transcription and return the API response"""
+    user_data = user_sessions[session_id]
+    
+    # Analyze media file with FFmpeg if available
+    media_info = None
+    formatted_duration = None
+    if is_ffmpeg_available():
+        try:
+            media_info = get_media_info(file_path)
+            if media_info:
+                # Formatted once here and reused for the job data below
+                formatted_duration = format_duration(media_info['duration'])
+                print(f"Media analysis for {filename}:")
+                print(f"  Duration: {formatted_duration}")
+                print(f"  Size: {media_info['size'] / (1024*1024):.1f} MB")
+                print(f"  Format: {media_info['format_name']}")
+        except Exception as e:
+            print(f"Error analyzing media file: {e}")
+    
+    # Create job ID and start processing
+    job_id = str(uuid.uuid4())
+    
+    # Initialize job status with media info
+    job_data = {
+        'job_id': job_id,
+        'filename': filename,
+        'status': 'queued',
+        'timestamp': datetime.now().isoformat(),
+        'file_type': file_type,
+        'file_path': file_path
+    }
+    
+    # Add media info if available
+    if media_info:
+        job_data.update({
+            'duration': media_info['duration'],
+            'formatted_duration': formatted_duration,
+            'file_size': media_info['size'],
+            'format_name': media_info['format_name'],
+            'has_audio': media_info['has_audio'],
+            'has_video': media_info['has_video'],
+            'audio_codec': media_info['audio_codec'],
+            'video_codec': media_info['video_codec'],
+            'sample_rate': media_info['sample_rate'],
+            'channels': media_info['channels']
+        })
+    
+    with user_data['lock']:
+        user_data['processing_jobs'][job_id] = job_data
+        session_changed(user_data)
+    
+    # Queue background processing
+    job_executor.submit(process_transcription_async, session_id, job_id, file_path, None, filename)
+    
+    return jsonify({
+        'message': f'File "{filename}" uploaded successfully. Transcription started.',
+        'job_id': job_id,
+        'filename': filename,
+        'file_type': file_type
+    })
+
+def upload_path(filename):
+    """Unique path in the upload folder for a (secured) filename"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # The timestamp alone repeats for uploads within the same second
+    unique_filename = f"{timestamp}_{uuid.uuid4().hex[:12]}_{filename}"
+    return os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
+
 @app.route('/api/upload', methods=['POST'])
 def upload_file():
     """Handle file uploads for transcription"""
     try:
         session_id = get_or_create_session()
-        user_data = user_sessions[session_id]
         
         if 'file' not in request.files:
             return jsonify({'error': 'No file provided'}), 400
@@ -244,71 +408,56 @@ def upload_file():
         
         # Save the file
         filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        unique_filename = f"{timestamp}_{filename}"
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
+        file_path = upload_path(filename)
         file.save(file_path)
         
-        # Analyze media file with FFmpeg if available
-        media_info = None
-        if is_ffmpeg_available():
-            try:
-                media_info = get_media_info(file_path)
-                if media_info:
-                    print(f"Media analysis for {filename}:")
-                    print(f"  Duration: {format_duration(media_info['duration'])}")
-                    print(f"  Size: {media_info['size'] / (1024*1024):.1f} MB")
-                    print(f"  Format: {media_info['format_name']}")
-            except Exception as e:
-                print(f"Error analyzing media file: {e}")
+        return start_upload_job(session_id, file_path, filename, file_type)
         
-        # Create job ID and start processing
-        job_id = str(uuid.uuid4())
+    except Exception as e:
+        return jsonify({'error': f'Error processing upload: {str(e)}'}), 500
+
+@app.route('/api/upload-stream', methods=['POST'])
+def upload_stream():
+    """Handle raw-body uploads, writing the request stream straight to disk
+    
+    The file is the request body and its name goes in the X-Filename header:
+    curl -X POST --data-binary @talk.mp3 -H "X-Filename: talk.mp3" .../api/upload-stream
+    This skips multipart parsing and the extra temp-file copy it makes.
+    """
+    file_path = None
+    complete = False
+    try:
+        session_id = get_or_create_session()
         
-        # Initialize job status with media info
-        job_data = {
-            'job_id': job_id,
-            'filename': filename,
-            'status': 'queued',
-            'timestamp': datetime.now().isoformat(),
-            'file_type': file_type,
-            'file_path': file_path
-        }
+        filename = secure_filename(request.headers.get('X-Filename', ''))
+        if not filename:
+            return jsonify({'error': 'No filename provided in X-Filename header'}), 400
         
-        # Add media info if available
-        if media_info:
-            job_data.update({
-                'duration': media_info['duration'],
-                'formatted_duration': format_duration(media_info['duration']),
-                'file_size': media_info['size'],
-                'format_name': media_info['format_name'],
-                'has_audio': media_info['has_audio'],
-                'has_video': media_info['has_video'],
-                'audio_codec': media_info['audio_codec'],
-                'video_codec': media_info['video_codec'],
-                'sample_rate': media_info['sample_rate'],
-                'channels': media_info['channels']
-            })
+        is_allowed, file_type = allowed_file(filename)
+        if not is_allowed:
+            return jsonify({'error': 'File type not supported. Please upload audio or video files.'}), 400
         
-        user_data['processing_jobs'][job_id] = job_data
+        path = upload_path(filename)
+        # 'x' never opens another upload's file; once created, cleanup below owns it
+        with open(path, 'xb') as f:
+            file_path = path
+            shutil.copyfileobj(request.stream, f, length=UPLOAD_COPY_SIZE)
         
-        # Start background processing
-        thread = threading.Thread(
-            target=process_transcription_async,
-            args=(session_id, job_id, file_path, None, filename)
-        )
-        thread.daemon = True
-        thread.start()
+        if os.path.getsize(file_path) == 0:
+            return jsonify({'error': 'No file provided'}), 400
         
-        return jsonify({
-            'message': f'File "{filename}" uploaded successfully. Transcription started.',
-            'job_id': job_id,
-            'filename': filename,
-            'file_type': file_type
-        })
+        complete = True
+        return start_upload_job(session_id, file_path, filename, file_type)
         
+    except RequestEntityTooLarge:
+        # The body stream stops at MAX_CONTENT_LENGTH
+        return jsonify({'error': f'File too large. Maximum size is {MAX_CONTENT_LENGTH // (1024*1024)}MB'}), 413
     except Exception as e:
         return jsonify({'error': f'Error processing upload: {str(e)}'}), 500
+    finally:
+        # An upload that was cut short, too large or empty leaves nothing behind
+        if not complete and file_path and os.path.exists(file_path):
+            os.remove(file_path)
 
 @app.route('/api/transcribe-url', methods=['POST'])
 def transcribe_url():
@@ -329,21 +478,18 @@ def transcribe_url():
         job_id = str(uuid.uuid4())
         
         # Initialize job status
-        user_data['processing_jobs'][job_id] = {
-            'job_id': job_id,
-            'url': url,
-            'status': 'queued',
-            'timestamp': datetime.now().isoformat(),
-            'source': 'url'
-        }
-        
-        # Start background processing
-        thread = threading.Thread(
-            target=process_transcription_async,
-            args=(session_id, job_id, None, url, f'URL: {url}')
-        )
-        thread.daemon = True
-        thread.start()
+        with user_data['lock']:
+            user_data['processing_jobs'][job_id] = {
+                'job_id': job_id,
+                'url': url,
+                'status': 'queued',
+                'timestamp': datetime.now().isoformat(),
+                'source': 'url'
+            }
+            session_changed(user_data)
+        
+        # Queue background processing
+        job_executor.submit(process_transcription_async, session_id, job_id, None, url, f'URL: {url}')
         
         return jsonify({
             'message': f'URL transcription started.',
@@ -361,10 +507,14 @@ def get_job_status(job_id):
         session_id = get_or_create_session()
         user_data = user_sessions[session_id]
         
-        if job_id not in user_data['processing_jobs']:
+        # Copy under the lock so the response never mixes two updates
+        with user_data['lock']:
+            job_data = user_data['processing_jobs'].get(job_id)
+            job_data = dict(job_data) if job_data else None
+        
+        if job_data is None:
             return jsonify({'error': 'Job not found'}), 404
         
-        job_data = user_data['processing_jobs'][job_id]
         return jsonify(job_data)
         
     except Exception as e:
@@ -377,10 +527,27 @@ def get_transcriptions():
         session_id = get_or_create_session()
         user_data = user_sessions[session_id]
         
-        return jsonify({
-            'transcriptions': user_data['transcriptions'],
-            'processing_jobs': list(user_data['processing_jobs'].values())
-        })
+        # Polls between changes get the body built for the current version
+        with user_data['lock']:
+            version = user_data['version']
+            cached = user_data['listing_cache']
+            if cached is None or cached[0] != version:
+                transcriptions = [dict(t) for t in user_data['transcriptions_by_id'].values()]
+                processing_jobs = [dict(j) for j in user_data['processing_jobs'].values()]
+        
+        if cached is not None and cached[0] == version:
+            body = cached[1]
+        else:
+            body = app.json.dumps({
+                'transcriptions': transcriptions,
+                'processing_jobs': processing_jobs
+            })
+            with user_data['lock']:
+                # Only store it if nothing changed while it was being serialized
+                if user_data['version'] == version:
+                    user_data['listing_cache'] = (version, body)
+        
+        return app.response_class(body, mimetype='application/json')
         
     except Exception as e:
         return jsonify({'error': f'Error getting transcriptions: {str(e)}'}), 500
@@ -393,22 +560,34 @@ def download_transcription(job_id):
         user_data = user_sessions[session_id]
         
         # Find the transcription
-        transcription = None
-        for t in user_data['transcriptions']:
-            if t['job_id'] == job_id:
-                transcription = t
-                break
+        with user_data['lock']:
+            transcription = user_data['transcriptions_by_id'].get(job_id)
+            transcription = dict(transcription) if transcription else None
         
         if not transcription:
             return jsonify({'error': 'Transcription not found'}), 404
         
+        download_name = f"{transcription['filename']}_transcription.txt"
+        
+        # The text is already held in the session, so small ones skip the disk read
+        text = transcription.get('transcription')
+        if text is not None and len(text) <= INLINE_DOWNLOAD_LIMIT:
+            data = text.encode('utf-8')
+            if len(data) <= INLINE_DOWNLOAD_LIMIT:
+                return send_file(
+                    io.BytesIO(data),
+                    as_attachment=True,
+                    download_name=download_name,
+                    mimetype='text/plain'
+                )
+        
         if 'file_path' not in transcription or not os.path.exists(transcription['file_path']):
             return jsonify({'error': 'Transcription file not found'}), 404
         
         return send_file(
             transcription['file_path'],
             as_attachment=True,
-            download_name=f"{transcription['filename']}_transcription.txt",
+            download_name=download_name,
             mimetype='text/plain'
         )
         
@@ -422,19 +601,10 @@ def reset_session():
         session_id = get_or_create_session()
         
         # Clean up files
-        if session_id in user_sessions:
-            for transcription in user_sessions[session_id]['transcriptions']:
-                try:
-                    if 'file_path' in transcription and os.path.exists(transcription['file_path']):
-                        os.remove(transcription['file_path'])
-                except Exception as e:
-                    print(f"Error deleting transcription file: {e}")
+        remove_transcription_files(user_sessions[session_id])
         
         # Reset session
-        user_sessions[session_id] = {
-            'transcriptions': [],
-            'processing_jobs': {}
-        }
+        user_sessions[session_id] = new_session_data()
         
         return jsonify({'message': 'Session reset successfully'})
         
@@ -448,11 +618,16 @@ def get_status():
         session_id = get_or_create_session()
         user_data = user_sessions[session_id]
         
+        with user_data['lock']:
+            total_transcriptions = len(user_data['transcriptions_by_id'])
+            processing_jobs = len([j for j in user_data['processing_jobs'].values() if j['status'] == 'processing'])
+            completed_jobs = len([t for t in user_data['transcriptions_by_id'].values() if t['status'] == 'completed'])
+        
         return jsonify({
             'session_id': session_id,
-            'total_transcriptions': len(user_data['transcriptions']),
-            'processing_jobs': len([j for j in user_data['processing_jobs'].values() if j['status'] == 'processing']),
-            'completed_jobs': len([t for t in user_data['transcriptions'] if t['status'] == 'completed']),
+            'total_transcriptions': total_transcriptions,
+            'processing_jobs': processing_jobs,
+            'completed_jobs': completed_jobs,
             'ffmpeg_available': is_ffmpeg_available()
         })
         
@@ -511,7 +686,7 @@ def analyze_directory():
             return jsonify({'error': 'FFmpeg is not available on this system'}), 503
         
         # Analyze all media files in the directory
-        results = traverse_and_analyze_media(directory_path)
+        results = traverse_and_analyze_media(directory_path, verbose=False)
         
         if not results:
             return jsonify({
@@ -588,26 +763,34 @@ def enhanced_url_processing():
         job_id = str(uuid.uuid4())
         
         # Initialize job with URL type info
-        user_data['processing_jobs'][job_id] = {
-            'job_id': job_id,
-            'url': url,
-            'url_type': url_type,
-            'status': 'downloading',
-            'timestamp': datetime.now().isoformat(),
-            'source': 'enhanced_url'
-        }
+        with user_data['lock']:
+            user_data['processing_jobs'][job_id] = {
+                'job_id': job_id,
+                'url': url,
+                'url_type': url_type,
+                'status': 'downloading',
+                'timestamp': datetime.now().isoformat(),
+                'source': 'enhanced_url'
+            }
+            session_changed(user_data)
         
         def process_enhanced_url():
             try:
                 # Update status
-                user_data['processing_jobs'][job_id]['status'] = 'downloading'
+                with user_data['lock']:
+                    user_data['processing_jobs'][job_id]['status'] = 'downloading'
+                    session_changed(user_data)
                 
                 # Download from URL
                 downloaded_file = URLService.download_from_url(url)
                 
                 # Update status and start transcription
-                user_data['processing_jobs'][job_id]['status'] = 'transcribing'
-                user_data['processing_jobs'][job_id]['downloaded_file'] = downloaded_file
+                with user_data['lock']:
+                    user_data['processing_jobs'][job_id].update({
+                        'status': 'transcribing',
+                        'downloaded_file': downloaded_file
+                    })
+                    session_changed(user_data)
                 
                 # Transcribe the downloaded file
                 result = transcribe_file(downloaded_file, job_id)
@@ -625,15 +808,15 @@ def enhanced_url_processing():
                 }
                 
                 # Save to file
-                transcription_file = f'transcriptions/{job_id}.txt'
-                with open(transcription_file, 'w', encoding='utf-8') as f:
-                    f.write(result)
+                transcription_file = save_transcription(job_id, result)
                 
                 transcription_data['file_path'] = transcription_file
                 
                 # Update session data
-                user_data['transcriptions'].append(transcription_data)
-                user_data['processing_jobs'][job_id] = transcription_data
+                with user_data['lock']:
+                    user_data['transcriptions_by_id'][job_id] = transcription_data
+                    user_data['processing_jobs'][job_id] = transcription_data
+                    session_changed(user_data)
                 
                 # Clean up downloaded file
                 try:
@@ -642,16 +825,16 @@ def enhanced_url_processing():
                     print(f"Error cleaning up downloaded file: {e}")
                 
             except Exception as e:
-                user_data['processing_jobs'][job_id].update({
-                    'status': 'failed',
-                    'error': str(e),
-                    'timestamp': datetime.now().isoformat()
-                })
+                with user_data['lock']:
+                    user_data['processing_jobs'][job_id].update({
+                        'status': 'failed',
+                        'error': str(e),
+                        'timestamp': datetime.now().isoformat()
+                    })
+                    session_changed(user_data)
         
-        # Start background processing
-        thread = threading.Thread(target=process_enhanced_url)
-        thread.daemon = True
-        thread.start()
+        # Queue background processing
+        job_executor.submit(process_enhanced_url)
         
         return jsonify({
             'message': f'{url_type.title()} URL processing started.',
@@ -671,11 +854,8 @@ def summarize_transcription(job_id):
         user_data = user_sessions[session_id]
         
         # Find the transcription
-        transcription = None
-        for t in user_data['transcriptions']:
-            if t['job_id'] == job_id:
-                transcription = t
-                break
+        with user_data['lock']:
+            transcription = user_data['transcriptions_by_id'].get(job_id)
         
         if not transcription:
             return jsonify({'error': 'Transcription not found'}), 404
@@ -686,19 +866,23 @@ def summarize_transcription(job_id):
         # Initialize media processor service
         processor = MediaProcessorService()
         
-        # Generate summary
-        summary = processor.summarize_transcription(transcription['transcription'])
+        # Generate summary and key topics in one request
+        analysis = processor.analyze_transcription(transcription['transcription'])
         
-        if not summary:
+        if not analysis or not analysis['summary']:
             return jsonify({'error': 'Failed to generate summary'}), 500
         
-        # Extract key topics
-        topics = processor.extract_key_topics(transcription['transcription'])
+        summary = analysis['summary']
+        topics = analysis['key_topics']
         
         # Save summary to transcription data
-        transcription['summary'] = summary
-        transcription['key_topics'] = topics
-        transcription['summary_timestamp'] = datetime.now().isoformat()
+        with user_data['lock']:
+            transcription.update({
+                'summary': summary,
+                'key_topics': topics,
+                'summary_timestamp': datetime.now().isoformat()
+            })
+            session_changed(user_data)
         
         return jsonify({
             'success': True,